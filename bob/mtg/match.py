@@ -89,7 +89,8 @@ class LocalMtgMatch:
             winner_id=None,
             reason=None,
         )
-        game.validate()
+        if __debug__:
+            game.validate()
 
         self.engine = MTGEngine(game)
         self.surface = ActionSurface()
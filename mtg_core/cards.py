@@ -258,7 +258,7 @@ class TargetSpec:
             raise ValueError("TargetSpec.selector must be Selector")
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Effect:
     type: EffectType
     params: Dict[str, Any]
@@ -290,7 +290,7 @@ class RulesBlock:
     keywords: Set[Keyword] = field(default_factory=set)
     effects: List[Effect] = field(default_factory=list)  # spell effects
     static_abilities: List[StaticAbility] = field(default_factory=list)
-    triggered_abilities: List[TriggeredAbility] = field(default_factory=list)
+    triggered_abilities: Tuple[TriggeredAbility, ...] = ()
     activated_abilities: List[ActivatedAbility] = field(default_factory=list)
     additional_costs: List[AbilityCost] = field(default_factory=list)
     alternate_costs: List[Dict[str, Any]] = field(default_factory=list)
@@ -1093,6 +1093,7 @@ def _parse_oracle_text(oracle_text: Optional[str], card_types: Set[CardType], ca
     equipment_stats: Optional[EquipmentStats] = None
     aura_stats: Optional[AuraStats] = None
     unparsed: List[str] = []
+    triggered: List[TriggeredAbility] = []
 
     if not oracle_text:
         return ParsedRules(rules, equipment_stats, aura_stats, unparsed)
@@ -1177,7 +1178,7 @@ def _parse_oracle_text(oracle_text: Optional[str], card_types: Set[CardType], ca
 
         # Triggered abilities
         if line.startswith("When ") or line.startswith("Whenever ") or line.startswith("At "):
-            rules.triggered_abilities.append(_parse_triggered_line(line, card_name))
+            triggered.append(_parse_triggered_line(line, card_name))
             idx += 1
             continue
 
@@ -1195,6 +1196,7 @@ def _parse_oracle_text(oracle_text: Optional[str], card_types: Set[CardType], ca
             idx += 1
             continue
 
+    rules.triggered_abilities = tuple(triggered)
     return ParsedRules(rules, equipment_stats, aura_stats, unparsed)
 
 
@@ -1425,7 +1427,7 @@ def _build_token_cards() -> Dict[str, Card]:
             keywords={Keyword[k] for k in spec.get("keywords", [])},
             effects=[],
             static_abilities=[],
-            triggered_abilities=[],
+            triggered_abilities=(),
             activated_abilities=[],
         )
 
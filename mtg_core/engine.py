@@ -1,7 +1,26 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+import functools
 import itertools
+import operator
+from types import MappingProxyType
 import uuid
 
 from mtg_core.actions import Action, ActionType
@@ -43,6 +62,231 @@ from mtg_core.aibase import (
     ResolutionStatus,
 )
 
+_MANA_SYMBOL_COLORS: Dict[str, str] = {"W": "WHITE", "U": "BLUE", "B": "BLACK", "R": "RED", "G": "GREEN"}
+# Order colored/ANY mana is spent on generic costs (alphabetical, as pools are keyed by name).
+_SPEND_ORDER: Tuple[str, ...] = tuple(sorted([c.value for c in Color] + ["ANY"]))
+_SPEND_ORDER_SET: FrozenSet[str] = frozenset(_SPEND_ORDER)
+
+# Canonical counter keys. Counter types read from card params are mapped onto these objects so
+# counter-dict lookups hit the identity fast path instead of a full string compare.
+_PLUS_ONE_COUNTER = "+1/+1"
+_MINUS_ONE_COUNTER = "-1/-1"
+_COUNTER_KEYS: Dict[str, str] = {_PLUS_ONE_COUNTER: _PLUS_ONE_COUNTER, _MINUS_ONE_COUNTER: _MINUS_ONE_COUNTER}
+
+# One bit per keyword so hot paths can test several keywords with a single AND.
+_KEYWORD_BITS: Dict[Keyword, int] = {kw: 1 << i for i, kw in enumerate(Keyword)}
+# Name -> Keyword, so effect params resolve with a dict lookup instead of Keyword[...] under try.
+_KEYWORDS_BY_NAME: Dict[str, Keyword] = dict(Keyword.__members__)
+_FIRST_STRIKE_BIT = _KEYWORD_BITS[Keyword.FIRST_STRIKE]
+_DOUBLE_STRIKE_BIT = _KEYWORD_BITS[Keyword.DOUBLE_STRIKE]
+_STRIKE_BITS = _FIRST_STRIKE_BIT | _DOUBLE_STRIKE_BIT
+_DEATHTOUCH_BIT = _KEYWORD_BITS[Keyword.DEATHTOUCH]
+_TRAMPLE_BIT = _KEYWORD_BITS[Keyword.TRAMPLE]
+_LIFELINK_BIT = _KEYWORD_BITS[Keyword.LIFELINK]
+_HEXPROOF_BIT = _KEYWORD_BITS[Keyword.HEXPROOF]
+_INDESTRUCTIBLE_BIT = _KEYWORD_BITS[Keyword.INDESTRUCTIBLE]
+_HASTE_BIT = _KEYWORD_BITS[Keyword.HASTE]
+_DEFENDER_BIT = _KEYWORD_BITS[Keyword.DEFENDER]
+_FLYING_BIT = _KEYWORD_BITS[Keyword.FLYING]
+_REACH_BIT = _KEYWORD_BITS[Keyword.REACH]
+_MENACE_BIT = _KEYWORD_BITS[Keyword.MENACE]
+_VIGILANCE_BIT = _KEYWORD_BITS[Keyword.VIGILANCE]
+_UNDEAD_RETURN_BIT = _KEYWORD_BITS[Keyword.UNDEAD_RETURN]
+
+# Fallback mana for basic lands whose card data carries no land_stats.
+_BASIC_LAND_PRODUCES: Mapping[str, Mapping[str, int]] = MappingProxyType({
+    "basic_swamp": MappingProxyType({"BLACK": 1}),
+    "basic_mountain": MappingProxyType({"RED": 1}),
+    "basic_island": MappingProxyType({"BLUE": 1}),
+    "basic_forest": MappingProxyType({"GREEN": 1}),
+    "basic_plains": MappingProxyType({"WHITE": 1}),
+})
+
+# Triggers on other creatures dying, as watcher-kind bits; _handle_dies walks their sources together.
+_DIES_WATCH_FRIENDLY = 1
+_DIES_WATCH_YOUR_TURN = 2
+_DIES_WATCH_BITS: Dict[TriggerType, int] = {
+    TriggerType.OTHER_FRIENDLY_DIES: _DIES_WATCH_FRIENDLY,
+    TriggerType.OTHER_DIES_DURING_YOUR_TURN: _DIES_WATCH_YOUR_TURN,
+}
+
+# Trigger condition "spell_type" values -> the card types that satisfy them.
+_CONDITION_SPELL_TYPES: Dict[str, Tuple[CardType, ...]] = {
+    "CREATURE": (CardType.CREATURE,),
+    "INSTANT_OR_SORCERY": (CardType.INSTANT, CardType.SORCERY),
+}
+
+# One bit per colour, keyed by the colour's string value as it appears in effect params.
+_COLOR_BITS: Dict[str, int] = {color.value: 1 << i for i, color in enumerate(Color)}
+
+# Per-card_id property bits; card types, colours and printed keywords never change in play.
+_CARD_CREATURE = 1 << 0
+_CARD_ARTIFACT = 1 << 1
+_CARD_ENCHANTMENT = 1 << 2
+_CARD_INSTANT = 1 << 3
+_CARD_SORCERY = 1 << 4
+_CARD_AURA = 1 << 5
+_CARD_EQUIPMENT = 1 << 6
+_CARD_BLACK = 1 << 7
+_CARD_FLASH = 1 << 8
+_CARD_PERMANENT_SPELL = _CARD_CREATURE | _CARD_ARTIFACT | _CARD_ENCHANTMENT
+_CARD_SORCERY_SPEED = _CARD_SORCERY | _CARD_PERMANENT_SPELL
+_CARD_CASTABLE = _CARD_INSTANT | _CARD_SORCERY_SPEED
+
+
+# Position of each step within a turn, for "until <step>" expiry comparisons.
+_STEP_ORDER: Dict[Step, int] = {
+    Step.UNTAP: 0,
+    Step.DRAW: 1,
+    Step.MAIN1: 2,
+    Step.DECLARE_ATTACKERS: 3,
+    Step.DECLARE_BLOCKERS: 4,
+    Step.DAMAGE: 5,
+    Step.MAIN2: 6,
+    Step.END: 7,
+}
+
+# Combat damage assignment, applied after every assignment in the step is known.
+_TARGET_PLAYER = 0
+_TARGET_CREATURE = 1
+
+
+# Visible-state snapshots (with battlefield views by instance id) shared by the triggers
+# queued for one event, keyed by (controller id, stack size).
+_TriggerSnapshots = Dict[Tuple[str, int], Tuple[VisibleState, Dict[str, Any]]]
+
+
+class _DamageEvent(NamedTuple):
+    source_id: str
+    source_controller: str
+    source_flags: int
+    target_kind: int
+    target_id: str
+    amount: int
+
+
+# Per-permanent entry of the derived battlefield state, rebuilt whenever the game version changes.
+@dataclass(slots=True)
+class _DerivedPerm:
+    base_power: Optional[int]
+    base_toughness: Optional[int]
+    counter_mod: int
+    power: Optional[int]
+    toughness: Optional[int]
+    keywords: Any
+    subtypes: Any
+    controller_id: str
+    base_override: Optional[Tuple[int, int]] = None
+    pt_mod_power: int = 0
+    pt_mod_toughness: int = 0
+    kw_mask: int = 0
+    cant_attack_players: Set[str] = field(default_factory=set)
+    must_attack: bool = False
+    must_be_blocked_by_all: bool = False
+    prevent_combat_damage: bool = False
+    assign_damage_as_unblocked: bool = False
+    goaded_by: Optional[str] = None
+
+
+def _card_flags(card: Any) -> int:
+    types = card.card_types
+    flags = 0
+    if CardType.CREATURE in types:
+        flags |= _CARD_CREATURE
+    if CardType.ARTIFACT in types:
+        flags |= _CARD_ARTIFACT
+    if CardType.ENCHANTMENT in types:
+        flags |= _CARD_ENCHANTMENT
+    if CardType.INSTANT in types:
+        flags |= _CARD_INSTANT
+    if CardType.SORCERY in types:
+        flags |= _CARD_SORCERY
+    if card.aura_stats is not None:
+        flags |= _CARD_AURA
+    if card.equipment_stats is not None:
+        flags |= _CARD_EQUIPMENT
+    if Color.BLACK in card.colors:
+        flags |= _CARD_BLACK
+    if Keyword.FLASH in (card.rules.keywords or set()):
+        flags |= _CARD_FLASH
+    return flags
+
+
+def _grant_keyword(d: _DerivedPerm, kw: Keyword) -> None:
+    """Add kw to a derived entry, copying its shared keyword frozenset on first write."""
+    keywords = d.keywords
+    if kw in keywords:
+        return
+    if type(keywords) is frozenset:
+        keywords = d.keywords = set(keywords)
+    keywords.add(kw)
+
+
+def _remove_keyword(d: _DerivedPerm, kw: Keyword) -> None:
+    keywords = d.keywords
+    if kw not in keywords:
+        return
+    if type(keywords) is frozenset:
+        keywords = d.keywords = set(keywords)
+    keywords.remove(kw)
+
+
+def _set_pool_count(colored: Dict[str, int], key: str, count: int) -> None:
+    """Store a mana pool count, dropping the key at zero rather than writing it and popping it."""
+    if count > 0:
+        colored[key] = count
+    else:
+        colored.pop(key, None)
+
+
+def _keyword_param(kw: Any) -> Optional[Keyword]:
+    """Resolve a keyword effect param, given as a Keyword or its name, to a Keyword (None if unknown)."""
+    if isinstance(kw, str):
+        return _KEYWORDS_BY_NAME.get(kw)
+    return kw
+
+
+def _keyword_params(names: Any) -> List[Keyword]:
+    """Resolve a keywords list param once per effect; unknown names are dropped."""
+    return [kw for kw in map(_KEYWORDS_BY_NAME.get, names) if kw is not None]
+
+
+def _keyword_mask(keywords: Any) -> int:
+    mask = 0
+    for kw in keywords:
+        mask |= _KEYWORD_BITS.get(kw, 0)
+    return mask
+
+
+def _condition_always(_arg: Any, _source_perm: Any, _context: Dict[str, Any]) -> bool:
+    return True
+
+
+@functools.lru_cache(maxsize=None)
+def _scry_layouts(n: int) -> Tuple[Tuple[Tuple[int, ...], Tuple[int, ...]], ...]:
+    """(top, bottom) index layouts for scrying n cards, in the order options are offered."""
+    return tuple(
+        (order[: n - split], order[n - split :])
+        for order in itertools.permutations(range(n))
+        for split in range(n + 1)
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _fact_or_fiction_layouts(n: int) -> Tuple[Tuple[Tuple[int, ...], Tuple[int, ...]], ...]:
+    """(pile_a, pile_b) index layouts for splitting n cards; card 0 always lands in pile A."""
+    layouts = []
+    for mask in range(1 << (n - 1)):
+        pile_a = [0]
+        pile_b = []
+        for i in range(1, n):
+            if mask & (1 << (i - 1)):
+                pile_a.append(i)
+            else:
+                pile_b.append(i)
+        layouts.append((tuple(pile_a), tuple(pile_b)))
+    return tuple(layouts)
+
 
 class MTGEngine:
     """
@@ -61,10 +305,298 @@ class MTGEngine:
 
     def __init__(self, game_state: GameState):
         self.game = game_state
+        # The players-dict key objects are the canonical player ids. Controller and active-player
+        # fields are pointed at them, so the controller == player comparisons in the trigger and
+        # index paths short-circuit on identity instead of comparing characters.
+        self._player_ids: Dict[str, str] = {player_id: player_id for player_id in self.game.players}
+        turn = self.game.turn
+        turn.active_player_id = self._player_ids.get(turn.active_player_id, turn.active_player_id)
         self._priority_holder: str = self.game.turn.active_player_id
         self._pass_streak: int = 0
+        # Battlefield indexes, kept in battlefield insertion order and maintained by
+        # _put_onto_battlefield / _remove_from_battlefield.
+        self._bf_by_controller: Dict[str, Dict[str, Permanent]] = {}
+        self._creatures_by_controller: Dict[str, Dict[str, None]] = {}
+        self._subtype_index: Dict[str, Dict[str, Dict[str, None]]] = {}
+        # Permanents whose card has continuous static effects (see _card_static_effects).
+        self._bf_static_sources: Dict[str, Permanent] = {}
+        # TriggerType -> instance_id -> permanents whose card has a triggered ability of that type.
+        self._bf_by_trigger: Dict[TriggerType, Dict[str, Permanent]] = {}
+        # (TriggerType, controller) -> the same permanents split by controller, for triggers
+        # such as UPKEEP that only fire for one player.
+        self._bf_by_trigger_controller: Dict[Tuple[TriggerType, str], Dict[str, Permanent]] = {}
+        # Permanents watching for other creatures dying (OTHER_FRIENDLY_DIES and/or
+        # OTHER_DIES_DURING_YOUR_TURN), in battlefield order, as (permanent, controller, kinds,
+        # abilities) records so _handle_dies reads flat fields; kinds is a mask of _DIES_WATCH_*
+        # bits. See _card_other_dies_triggers.
+        self._bf_other_dies_watchers: Dict[str, Tuple[Permanent, str, int, Tuple[Tuple[int, Any], ...]]] = {}
+        # controller -> instance_id -> that permanent's COST_REDUCTION (tags, subtype, amount) rows.
+        self._cost_reducers: Dict[str, Dict[str, Tuple[Tuple[List[str], Optional[str], int], ...]]] = {}
+        self._build_card_lookups()
+        self._build_effect_dispatch()
+        # Reverse of game.exile_links: source_instance_id -> exiled instance_ids, in link order.
+        self._exiled_by_source: Dict[str, Dict[str, None]] = {}
+        for exiled_id, source_id in self.game.exile_links.items():
+            self._exiled_by_source.setdefault(source_id, {})[exiled_id] = None
+        # Spell stack items by instance_id, maintained by _push_stack / _pop_stack.
+        self._stack_index: Dict[str, StackItem] = {
+            item.instance.instance_id: item for item in self.game.zones.stack if item.instance is not None
+        }
+        # Memoized _derived_battlefield_state; bump _derived_version on any mutation it reads.
+        self._derived_version: int = 0
+        self._derived_cache_version: int = -1
+        self._derived_cache: Dict[str, _DerivedPerm] = {}
+        # Memoized _attachments_by_host; bump _attachments_generation (via _attachments_changed)
+        # whenever an attached_to changes or a permanent enters or leaves the battlefield.
+        self._attachments_generation: int = 0
+        self._attachments_version: int = -1
+        self._attachments_cache: Dict[str, List[str]] = {}
+        # _cost_reduction_for_spell results by (player_id, card_id), valid for one derived version.
+        self._cost_reduction_cache: Dict[Tuple[str, str], int] = {}
+        self._cost_reduction_version: int = -1
+        # _attack_tax_amount totals by defending player, valid for one derived version.
+        self._attack_tax_totals: Dict[str, int] = {}
+        self._attack_tax_version: int = -1
+        self._trigger_surface = ActionSurface()
+        # Deathtouch damage recorded by _apply_deal_damage, consumed by the next SBA check.
+        self._sba_deathtouch_pending: set[str] = set()
+        # Permanents marked with damage since the last SBA check. While the derived version is
+        # unchanged, only these can have become lethal, so SBA checks them instead of the battlefield.
+        self._sba_damaged: set[str] = set()
+        self._sba_checked_version: int = -1
+        for perm in self.game.zones.battlefield.values():
+            self._check_known_card(perm)
+            perm.controller_id = self._player_ids.get(perm.controller_id, perm.controller_id)
+            self._index_permanent(perm)
         self._log("Game engine initialized.")
 
+    def _build_effect_dispatch(self) -> None:
+        """Bind the per-effect handlers that need no branch-local logic in _resolve_effects."""
+        # Symbolic damage amounts: (meta, source_controller_id, source_instance_id) -> int.
+        count = self._count_subtype_on_battlefield
+        self._amount_resolvers: Dict[str, Callable[..., int]] = {
+            "X": lambda meta, ctrl, src: int((meta or {}).get("x", 0) or 0),
+            "COUNT_DRAGONS": lambda meta, ctrl, src: count("Dragon", controller_id=ctrl),
+            "COUNT_ELVES": lambda meta, ctrl, src: count("Elf", controller_id=None),
+            "COUNT_OTHER_ELVES": lambda meta, ctrl, src: count("Elf", controller_id=None, exclude_id=src),
+        }
+
+        def per_target(fn: Callable[..., None], *, with_eff: bool = True, with_source: bool = False):
+            def handler(eff, group, source_instance_id, controller_id):
+                for t in group:
+                    args = (eff, t) if with_eff else (t,)
+                    if with_source:
+                        args += (source_instance_id,)
+                    fn(*args)
+
+            return handler
+
+        # (eff, group, source_instance_id, controller_id) -> None
+        self._group_effect_handlers: Dict[EffectType, Callable[..., None]] = {
+            EffectType.ADD_MANA: lambda eff, group, src, ctrl: self._apply_add_mana(eff, ctrl),
+            EffectType.ADD_MANA_PER_ELF: lambda eff, group, src, ctrl: (
+                self._apply_add_mana_per_elf(eff, ctrl)
+            ),
+            EffectType.ADD_MANA_PER_TAPPED_LANDS: lambda eff, group, src, ctrl: (
+                self._apply_add_mana_per_tapped_lands(eff, ctrl)
+            ),
+            EffectType.CREATE_TOKEN: lambda eff, group, src, ctrl: self._apply_create_token(eff, ctrl, src),
+            EffectType.DESTROY_CREATURE: per_target(self._apply_destroy_creature),
+            EffectType.DESTROY_ARTIFACT: per_target(self._apply_destroy_artifact, with_eff=False),
+            EffectType.DESTROY_FLYING_CREATURE: per_target(
+                self._apply_destroy_flying_creature, with_eff=False
+            ),
+            EffectType.DESTROY_PERMANENT: per_target(self._apply_destroy_permanent_target, with_eff=False),
+            EffectType.EXILE_CREATURE: per_target(self._apply_exile_creature),
+            EffectType.EXILE_TARGET_UNTIL: per_target(self._apply_exile_until, with_source=True),
+            EffectType.RETURN_TO_HAND: per_target(self._return_to_hand, with_eff=False),
+            EffectType.RETURN_TWO_DIFFERENT_CONTROLLERS: per_target(self._return_to_hand, with_eff=False),
+            EffectType.RETURN_FROM_GRAVEYARD_TO_HAND: lambda eff, group, src, ctrl: (
+                self._return_from_graveyard_to_hand(group, eff, src)
+            ),
+            EffectType.RETURN_FROM_GRAVEYARD_TO_BATTLEFIELD_TAPPED: lambda eff, group, src, ctrl: (
+                self._return_from_graveyard_to_battlefield_tapped(group, eff, src)
+            ),
+            EffectType.ATTACH_EQUIPMENT: lambda eff, group, src, ctrl: self._attach_equipment(group, src),
+            EffectType.ATTACH_ALL_EQUIPMENT: lambda eff, group, src, ctrl: (
+                self._attach_all_equipment(group, src, ctrl)
+            ),
+        }
+
+        # Continuous effects, applied while computing the derived battlefield state.
+        self._untargeted_continuous_handlers: Dict[EffectType, Callable[..., None]] = {
+            EffectType.OTHER_CONTROLLED_BUFF_PER_ATTACHMENT: self._continuous_buff_per_attachment,
+            EffectType.CONTROLLED_TYPE_LORD: self._continuous_type_lord,
+            EffectType.OTHER_CONTROLLED_TYPE_LORD: self._continuous_type_lord,
+            EffectType.EQUIPPED_ONLY: self._continuous_equipped_only,
+        }
+        self._targeted_continuous_handlers: Dict[EffectType, Callable[..., None]] = {
+            EffectType.SET_BASE_P_T: self._continuous_set_base_pt,
+            EffectType.MODIFY_P_T: self._continuous_modify_pt,
+            EffectType.ADD_KEYWORD: self._continuous_add_keyword,
+            EffectType.REMOVE_KEYWORD: self._continuous_remove_keyword,
+            EffectType.ADD_SUBTYPE: self._continuous_add_subtype,
+            EffectType.CANT_ATTACK_PLAYER: self._continuous_cant_attack_player,
+            EffectType.REQUIRE_ATTACK: self._continuous_require_attack,
+            EffectType.REQUIRE_BLOCK: self._continuous_require_block,
+            EffectType.PREVENT_COMBAT_DAMAGE: self._continuous_prevent_combat_damage,
+            EffectType.ASSIGN_DAMAGE_AS_UNBLOCKED: self._continuous_assign_damage_as_unblocked,
+            EffectType.GOAD: self._continuous_goad,
+            EffectType.TEAM_BUFF: self._continuous_team_buff,
+        }
+        # The subset an EQUIPPED_ONLY effect may apply to its equipped creature.
+        self._attached_continuous_handlers: Dict[EffectType, Callable[..., None]] = {
+            effect_type: self._targeted_continuous_handlers[effect_type]
+            for effect_type in (EffectType.MODIFY_P_T, EffectType.ADD_KEYWORD, EffectType.REMOVE_KEYWORD)
+        }
+
+        # Spell resolution path per card_id, fixed by its card types: (item, card) -> resolve result.
+        self._spell_resolvers: Dict[str, Callable[[StackItem, Any], str]] = {}
+        for card_id, flags in self._card_flags.items():
+            if not flags & _CARD_PERMANENT_SPELL:
+                self._spell_resolvers[card_id] = self._resolve_effect_spell
+            elif flags & _CARD_AURA:
+                self._spell_resolvers[card_id] = self._resolve_aura_spell
+            else:
+                self._spell_resolvers[card_id] = self._resolve_permanent_spell
+
+    def _build_card_lookups(self) -> None:
+        """Precompute card_id sets for the card-type filters used inside zone scans."""
+        by_type: Dict[CardType, set] = {}
+        basic_lands = set()
+        basic_plains = set()
+        attachments = set()
+        equipment = set()
+        for card_id, card in self.game.card_db.items():
+            for card_type in card.card_types:
+                by_type.setdefault(card_type, set()).add(card_id)
+            if CardType.LAND in card.card_types:
+                if card_id.startswith("basic_"):
+                    basic_lands.add(card_id)
+                if card.land_stats and LandType.PLAINS in card.land_stats.land_types:
+                    basic_plains.add(card_id)
+            if card.equipment_stats is not None:
+                equipment.add(card_id)
+            if card.equipment_stats is not None or card.aura_stats is not None:
+                attachments.add(card_id)
+        self._card_ids_by_type: Dict[CardType, FrozenSet[str]] = {k: frozenset(v) for k, v in by_type.items()}
+        self._basic_land_card_ids: FrozenSet[str] = frozenset(basic_lands)
+        self._plains_card_ids: FrozenSet[str] = frozenset(basic_plains)
+        self._equipment_card_ids: FrozenSet[str] = frozenset(equipment)
+        self._attachment_card_ids: FrozenSet[str] = frozenset(attachments)
+        self._instant_or_sorcery_card_ids: FrozenSet[str] = self._card_ids_by_type.get(
+            CardType.INSTANT, frozenset()
+        ) | self._card_ids_by_type.get(CardType.SORCERY, frozenset())
+        self._cost_reductions_by_card: Dict[str, Tuple[Tuple[List[str], Optional[str], int], ...]] = {}
+        for card_id, card in self.game.card_db.items():
+            rows = tuple(
+                (
+                    eff.params.get("spell_tags") or [],
+                    eff.params.get("spell_subtype"),
+                    int(eff.params.get("amount", 0) or 0),
+                )
+                for sa in card.rules.static_abilities
+                for eff in sa.effects
+                if eff.type == EffectType.COST_REDUCTION
+            )
+            if rows:
+                self._cost_reductions_by_card[card_id] = rows
+        self._card_keywords: Dict[str, FrozenSet[Keyword]] = {
+            card_id: frozenset(card.rules.keywords) for card_id, card in self.game.card_db.items()
+        }
+        self._card_keyword_masks: Dict[str, int] = {
+            card_id: _keyword_mask(keywords) for card_id, keywords in self._card_keywords.items()
+        }
+        # (base power, base toughness) per card_id; (None, None) for non-creatures.
+        self._card_base_pt: Dict[str, Tuple[Optional[int], Optional[int]]] = {
+            card_id: (
+                (card.creature_stats.base_power, card.creature_stats.base_toughness)
+                if card.creature_stats is not None
+                else (None, None)
+            )
+            for card_id, card in self.game.card_db.items()
+        }
+        self._card_subtypes: Dict[str, FrozenSet[str]] = {
+            card_id: frozenset(card.subtypes) for card_id, card in self.game.card_db.items()
+        }
+        self._card_flags: Dict[str, int] = {
+            card_id: _card_flags(card) for card_id, card in self.game.card_db.items()
+        }
+        # card_id -> the card's continuous static effects, in printed order; cost reductions are
+        # read through _cost_reducers instead. Cards without any are absent.
+        self._card_static_effects: Dict[str, Tuple[Any, ...]] = {}
+        for card_id, card in self.game.card_db.items():
+            effects = tuple(
+                eff
+                for sa in card.rules.static_abilities
+                for eff in sa.effects
+                if eff.type != EffectType.COST_REDUCTION
+            )
+            if effects:
+                self._card_static_effects[card_id] = effects
+        # Parsed P/T amounts and keyword lists of the static effects above (and effects nested in
+        # their params), filled on first use and keyed by id(effect). card_db outlives the engine,
+        # so those ids stay unique; effects built at runtime are parsed on each call instead.
+        self._static_effect_ids: frozenset[int] = frozenset(
+            id(e)
+            for effects in self._card_static_effects.values()
+            for eff in effects
+            for e in (eff, *eff.params.get("effects", ()))
+        )
+        self._effect_pt_amounts: Dict[int, Tuple[int, int]] = {}
+        self._effect_keywords: Dict[int, List[Keyword]] = {}
+        # (card_id, TriggerType) -> that card's triggered abilities of the type, in printed order,
+        # so _triggers_for is one dict probe; _card_trigger_types lists the types per card.
+        self._card_triggers: Dict[Tuple[str, TriggerType], Tuple[Any, ...]] = {}
+        self._card_trigger_types: Dict[str, Tuple[TriggerType, ...]] = {}
+        # ATTACKS and ATTACKS_OR_BLOCKS abilities per card_id (every card has an entry), in
+        # printed order, since both fire when the creature attacks.
+        self._card_attack_triggers: Dict[str, Tuple[Any, ...]] = {}
+        # OTHER_FRIENDLY_DIES and OTHER_DIES_DURING_YOUR_TURN abilities per card_id as
+        # (_DIES_WATCH_* bit, ability), in printed order; only cards with at least one are present.
+        self._card_other_dies_triggers: Dict[str, Tuple[Tuple[int, Any], ...]] = {}
+        self._card_other_dies_kinds: Dict[str, int] = {}
+        # id(condition) -> (check, arg) for the card DB's triggered-ability conditions; see
+        # _compile_trigger_condition. card_db outlives the engine, so the ids stay unique.
+        self._trigger_conditions: Dict[int, Tuple[Callable[..., bool], Any]] = {}
+        for card_id, card in self.game.card_db.items():
+            by_type: Dict[TriggerType, List[Any]] = {}
+            for ability in card.rules.triggered_abilities:
+                by_type.setdefault(ability.trigger, []).append(ability)
+                if ability.condition:
+                    self._trigger_conditions[id(ability.condition)] = self._compile_trigger_condition(
+                        ability.condition
+                    )
+            if by_type:
+                self._card_trigger_types[card_id] = tuple(by_type)
+                for trigger, abilities in by_type.items():
+                    self._card_triggers[(card_id, trigger)] = tuple(abilities)
+            self._card_attack_triggers[card_id] = tuple(
+                ability
+                for ability in card.rules.triggered_abilities
+                if ability.trigger is TriggerType.ATTACKS or ability.trigger is TriggerType.ATTACKS_OR_BLOCKS
+            )
+            other_dies = tuple(
+                (_DIES_WATCH_BITS[ability.trigger], ability)
+                for ability in card.rules.triggered_abilities
+                if ability.trigger in _DIES_WATCH_BITS
+            )
+            if other_dies:
+                self._card_other_dies_triggers[card_id] = other_dies
+                self._card_other_dies_kinds[card_id] = functools.reduce(
+                    operator.or_, (kind for kind, _ in other_dies), 0
+                )
+        # Colour name -> amount per land card, from land_stats (see _basic_land_produces).
+        self._land_produces: Dict[str, Mapping[str, int]] = {
+            card_id: MappingProxyType({c.value: n for c, n in card.land_stats.produces.items()})
+            for card_id, card in self.game.card_db.items()
+            if card.land_stats is not None
+        }
+        self._card_colors: Dict[str, int] = {
+            card_id: functools.reduce(operator.or_, (_COLOR_BITS[c.value] for c in card.colors), 0)
+            for card_id, card in self.game.card_db.items()
+        }
+
     @property
     def priority_holder(self) -> str:
         return self._priority_holder
@@ -149,21 +681,18 @@ class MTGEngine:
 
         if t.step == Step.UNTAP:
             self._untap_permanents(t.active_player_id)
-            t.phase = Phase.BEGINNING
-            t.step = Step.DRAW
+            self._set_step(Phase.BEGINNING, Step.DRAW)
             self._handle_upkeep(t.active_player_id)
             return
 
         if t.step == Step.DRAW:
             if not (t.turn_number == 1 and t.active_player_id == self.game.starting_player_id):
                 self._draw(t.active_player_id, 1)
-            t.phase = Phase.MAIN
-            t.step = Step.MAIN1
+            self._set_step(Phase.MAIN, Step.MAIN1)
             return
 
         if t.step == Step.MAIN1:
-            t.phase = Phase.COMBAT
-            t.step = Step.DECLARE_ATTACKERS
+            self._set_step(Phase.COMBAT, Step.DECLARE_ATTACKERS)
             t.attackers = []
             t.blockers = {}
             t.attackers_declared = False
@@ -171,14 +700,12 @@ class MTGEngine:
             return
 
         if t.step == Step.DECLARE_ATTACKERS:
-            t.phase = Phase.COMBAT
-            t.step = Step.DECLARE_BLOCKERS
+            self._set_step(Phase.COMBAT, Step.DECLARE_BLOCKERS)
             return
 
         if t.step == Step.DECLARE_BLOCKERS:
             self._resolve_combat_damage()
-            t.phase = Phase.MAIN
-            t.step = Step.MAIN2
+            self._set_step(Phase.MAIN, Step.MAIN2)
             t.attackers = []
             t.blockers = {}
             t.attackers_declared = False
@@ -186,8 +713,7 @@ class MTGEngine:
             return
 
         if t.step == Step.DAMAGE:
-            t.phase = Phase.MAIN
-            t.step = Step.MAIN2
+            self._set_step(Phase.MAIN, Step.MAIN2)
             t.attackers = []
             t.blockers = {}
             t.attackers_declared = False
@@ -195,8 +721,7 @@ class MTGEngine:
             return
 
         if t.step == Step.MAIN2:
-            t.phase = Phase.ENDING
-            t.step = Step.END
+            self._set_step(Phase.ENDING, Step.END)
             return
 
         if t.step == Step.END:
@@ -205,25 +730,31 @@ class MTGEngine:
 
         raise RuntimeError(f"Unhandled step transition: {t.step}")
 
+    def _set_step(self, phase: Phase, step: Step) -> None:
+        t = self.game.turn
+        t.phase = phase
+        t.step = step
+        # Temporary-effect durations read the turn position.
+        self._invalidate_derived()
+
     def _end_turn(self) -> None:
         t = self.game.turn
 
         for ps in self.game.players.values():
             ps.mana_pool.clear()
             ps.lands_played_this_turn = 0
+            ps.damage_taken_this_turn = 0
 
         for perm in self.game.zones.battlefield.values():
             perm.state.damage_marked = 0
 
-        self.game.damage_dealt_to_players = {pid: 0 for pid in self.game.players}
-
         t.turn_number += 1
         if self.game.extra_turns:
-            t.active_player_id = self.game.extra_turns.pop(0)
+            player_id = self.game.extra_turns.pop(0)
+            t.active_player_id = self._player_ids.get(player_id, player_id)
         else:
             t.active_player_id = self._other_player(t.active_player_id)
-        t.phase = Phase.BEGINNING
-        t.step = Step.UNTAP
+        self._set_step(Phase.BEGINNING, Step.UNTAP)
         t.attackers = []
         t.blockers = {}
         t.attackers_declared = False
@@ -238,9 +769,11 @@ class MTGEngine:
 
     def get_visible_state(self, player_id: str) -> VisibleState:
         derived = self._derived_battlefield_state()
+        # card_view runs for every card in every zone; bind the lookup once.
+        card_db_get = self.game.card_db.get
 
         def card_view(ci: CardInstance) -> Dict[str, Any]:
-            card = self.game.card_db.get(ci.card_id)
+            card = card_db_get(ci.card_id)
             if card is None:
                 return {
                     "name": ci.card_id,
@@ -271,18 +804,35 @@ class MTGEngine:
                 "toughness": toughness,
             }
 
-        attachments_by_host: Dict[str, List[str]] = {}
-        for perm in self.game.zones.battlefield.values():
-            attached_to = perm.state.attached_to
-            if attached_to:
-                attachments_by_host.setdefault(attached_to, []).append(perm.instance.instance_id)
+        attachments_by_host = self._attachments_by_host()
 
         battlefield = []
         for perm in self.game.zones.battlefield.values():
             view = card_view(perm.instance)
-            d = derived.get(perm.instance.instance_id, {})
-            keywords = d.get("keywords")
-            subtypes = d.get("subtypes")
+            d = derived.get(perm.instance.instance_id)
+            if d is None:
+                # No derived entry: printed characteristics and no combat restrictions.
+                subtypes = view["subtypes"]
+                power = view["power"]
+                toughness = view["toughness"]
+                keywords = view["keywords"]
+                cant_attack_players: List[str] = []
+                must_attack = False
+                must_be_blocked_by_all = False
+                prevent_combat_damage = False
+                assign_damage_as_unblocked = False
+                goaded_by = None
+            else:
+                subtypes = list(d.subtypes)
+                power = d.power
+                toughness = d.toughness
+                keywords = [kw.value for kw in d.keywords]
+                cant_attack_players = list(d.cant_attack_players)
+                must_attack = bool(d.must_attack)
+                must_be_blocked_by_all = bool(d.must_be_blocked_by_all)
+                prevent_combat_damage = bool(d.prevent_combat_damage)
+                assign_damage_as_unblocked = bool(d.assign_damage_as_unblocked)
+                goaded_by = d.goaded_by
             battlefield.append(
                 PermanentView(
                     instance_id=perm.instance.instance_id,
@@ -290,25 +840,25 @@ class MTGEngine:
                     name=view["name"],
                     card_type=view["card_type"],
                     card_types=view["card_types"],
-                    subtypes=list(subtypes) if subtypes is not None else view["subtypes"],
+                    subtypes=subtypes,
                     mana_cost=view["mana_cost"],
-                    power=d.get("power", view["power"]),
-                    toughness=d.get("toughness", view["toughness"]),
+                    power=power,
+                    toughness=toughness,
                     owner_id=perm.instance.owner_id,
                     controller_id=perm.controller_id,
-                    keywords=[kw.value for kw in keywords] if keywords is not None else view["keywords"],
+                    keywords=keywords,
                     tapped=perm.state.tapped,
                     damage_marked=perm.state.damage_marked,
                     counters=dict(perm.state.counters),
                     summoning_sick=perm.state.summoning_sick,
                     attached_to=perm.state.attached_to,
-                    attachments=attachments_by_host.get(perm.instance.instance_id, []),
-                    cant_attack_players=list(d.get("cant_attack_players", [])),
-                    must_attack=bool(d.get("must_attack", False)),
-                    must_be_blocked_by_all=bool(d.get("must_be_blocked_by_all", False)),
-                    prevent_combat_damage=bool(d.get("prevent_combat_damage", False)),
-                    assign_damage_as_unblocked=bool(d.get("assign_damage_as_unblocked", False)),
-                    goaded_by=d.get("goaded_by"),
+                    attachments=list(attachments_by_host.get(perm.instance.instance_id, ())),
+                    cant_attack_players=cant_attack_players,
+                    must_attack=must_attack,
+                    must_be_blocked_by_all=must_be_blocked_by_all,
+                    prevent_combat_damage=prevent_combat_damage,
+                    assign_damage_as_unblocked=assign_damage_as_unblocked,
+                    goaded_by=goaded_by,
                 )
             )
         stack_view = []
@@ -415,12 +965,14 @@ class MTGEngine:
         for ps in self.game.players.values():
             ps.mana_pool.clear()
 
+    def _controlled_permanents(self, player_id: Optional[str]) -> Any:
+        return self._bf_by_controller.get(player_id, {}).values()
+
     def _untap_permanents(self, player_id: str) -> None:
-        for perm in self.game.zones.battlefield.values():
-            if perm.controller_id == player_id:
-                perm.state.tapped = False
-                if self._is_creature(perm):
-                    perm.state.summoning_sick = False
+        for perm in self._controlled_permanents(player_id):
+            perm.state.tapped = False
+            if self._is_creature(perm):
+                perm.state.summoning_sick = False
 
     def _log(self, msg: str) -> None:
         self.game.metadata.log(msg)
@@ -524,13 +1076,7 @@ class MTGEngine:
 
         if CardType.LAND in card.card_types:
             return False
-        if not (
-            CardType.INSTANT in card.card_types
-            or CardType.SORCERY in card.card_types
-            or CardType.CREATURE in card.card_types
-            or CardType.ARTIFACT in card.card_types
-            or CardType.ENCHANTMENT in card.card_types
-        ):
+        if not self._card_flags.get(card_instance.card_id, 0) & _CARD_CASTABLE:
             return False
 
         if not self._timing_allows_cast(card, action.actor_id):
@@ -682,7 +1228,7 @@ class MTGEngine:
                     continue
                 if perm.controller_id != action.actor_id:
                     d = derived.get(perm.instance.instance_id)
-                    if d and Keyword.HEXPROOF in d["keywords"]:
+                    if d and d.kw_mask & _HEXPROOF_BIT:
                         return False
 
         return True
@@ -728,8 +1274,8 @@ class MTGEngine:
         # Must-attack creatures
         required = [
             pid for pid, d in derived.items()
-            if d["controller_id"] == action.actor_id
-            and d["must_attack"]
+            if d.controller_id == action.actor_id
+            and d.must_attack
             and self._creature_can_attack(self.game.zones.battlefield[pid], derived, defender_id)
         ]
         for rid in required:
@@ -791,19 +1337,17 @@ class MTGEngine:
 
         # Menace: must be blocked by 2+ creatures if blocked
         for attacker_id in t.attackers:
-            d = derived.get(attacker_id, {})
-            if Keyword.MENACE in d.get("keywords", set()):
+            d = derived.get(attacker_id)
+            if d is not None and d.kw_mask & _MENACE_BIT:
                 if len(mapping.get(attacker_id, [])) == 1:
                     return False
 
         # Require block: all creatures able to block must do so
         for attacker_id in t.attackers:
-            d = derived.get(attacker_id, {})
-            if not d.get("must_be_blocked_by_all", False):
+            d = derived.get(attacker_id)
+            if d is None or not d.must_be_blocked_by_all:
                 continue
-            for perm in self.game.zones.battlefield.values():
-                if perm.controller_id != action.actor_id:
-                    continue
+            for perm in self._controlled_permanents(action.actor_id):
                 if not self._is_creature(perm):
                     continue
                 if not self._creature_can_block(perm, attacker_id, derived):
@@ -887,7 +1431,7 @@ class MTGEngine:
                     instance=land,
                     controller_id=action.actor_id,
                 )
-                self.game.zones.battlefield[land.instance_id] = perm
+                self._put_onto_battlefield(perm)
                 ps.lands_played_this_turn += 1
                 self._pass_streak = 0
                 self._handle_etb(perm)
@@ -915,12 +1459,12 @@ class MTGEngine:
         perm.state.tapped = True
         self._pass_streak = 0
 
-        ps = self._ps(action.actor_id)
+        colored = self._ps(action.actor_id).mana_pool.colored
         for color, amount in produces.items():
-            ps.mana_pool.colored[color] = ps.mana_pool.colored.get(color, 0) + amount
+            colored[color] = colored.get(color, 0) + amount
 
         self._log(f"{action.actor_id} taps {perm.instance.card_id} for mana.")
-        return {"tapped": perm.instance.card_id, "mana_added": produces}
+        return {"tapped": perm.instance.card_id, "mana_added": dict(produces)}
 
     def _resolve_declare_attackers(self, action: Action) -> Dict[str, Any]:
         attackers = []
@@ -936,8 +1480,8 @@ class MTGEngine:
         for aid in attackers:
             perm = self.game.zones.battlefield.get(aid)
             if perm is not None:
-                d = derived.get(aid, {})
-                if Keyword.VIGILANCE not in d.get("keywords", set()):
+                d = derived.get(aid)
+                if d is None or not d.kw_mask & _VIGILANCE_BIT:
                     perm.state.tapped = True
 
         defender_id = self._other_player(action.actor_id)
@@ -1022,7 +1566,7 @@ class MTGEngine:
         if flashback:
             meta["exile_on_resolve"] = True
 
-        self.game.zones.stack.append(
+        self._push_stack(
             StackItem(
                 kind=StackItemKind.SPELL,
                 controller_id=action.actor_id,
@@ -1072,8 +1616,8 @@ class MTGEngine:
                     self._discard_from_hand(action.actor_id, cid)
             elif cost.type == CostType.SACRIFICE_SELF:
                 d = derived.get(perm.instance.instance_id)
-                if d and d.get("toughness") is not None:
-                    sacrificed_toughness += int(d["toughness"])
+                if d and d.toughness is not None:
+                    sacrificed_toughness += int(d.toughness)
                 self._sacrifice_permanent(perm)
             elif cost.type in (CostType.SACRIFICE_CREATURE, CostType.SACRIFICE_OTHER_CREATURE):
                 sacrifices = costs_payload.get("sacrifice", [])
@@ -1081,8 +1625,8 @@ class MTGEngine:
                     s_perm = self.game.zones.battlefield.get(sid)
                     if s_perm is not None:
                         d = derived.get(sid)
-                        if d and d.get("toughness") is not None:
-                            sacrificed_toughness += int(d["toughness"])
+                        if d and d.toughness is not None:
+                            sacrificed_toughness += int(d.toughness)
                         self._sacrifice_permanent(s_perm)
 
         self._pass_streak = 0
@@ -1104,7 +1648,7 @@ class MTGEngine:
             self._log(f"{action.actor_id} activates mana ability of {perm.instance.card_id}.")
             return {"activated_ability": perm.instance.card_id, "mana_ability": True}
 
-        self.game.zones.stack.append(
+        self._push_stack(
             StackItem(
                 kind=StackItemKind.ABILITY,
                 controller_id=action.actor_id,
@@ -1131,7 +1675,7 @@ class MTGEngine:
 
         if kind == "TRIGGER_TARGETS":
             trigger = context.get("trigger", {})
-            self.game.zones.stack.append(
+            self._push_stack(
                 StackItem(
                     kind=StackItemKind.ABILITY,
                     controller_id=trigger.get("controller_id"),
@@ -1184,7 +1728,7 @@ class MTGEngine:
                         ps.library.pop(i)
                         perm = Permanent(instance=ci, controller_id=player_id)
                         perm.state.tapped = True
-                        self.game.zones.battlefield[ci.instance_id] = perm
+                        self._put_onto_battlefield(perm)
                         self._handle_etb(perm)
                         self._handle_creature_enters(perm)
                         ps.library = list(ps.library)
@@ -1234,7 +1778,7 @@ class MTGEngine:
                     if chosen is not None:
                         perm = Permanent(instance=chosen, controller_id=player_id)
                         perm.state.tapped = True
-                        self.game.zones.battlefield[chosen.instance_id] = perm
+                        self._put_onto_battlefield(perm)
                         self._handle_etb(perm)
                         self._handle_creature_enters(perm)
                 self.game.rng.rng.shuffle(rest)
@@ -1330,10 +1874,7 @@ class MTGEngine:
                     self._counter_spell(target_id)
                 else:
                     if target_id and controller_id:
-                        item = next(
-                            (s for s in self.game.zones.stack if s.instance is not None and s.instance.instance_id == target_id),
-                            None,
-                        )
+                        item = self._stack_index.get(target_id)
                         if item is not None and item.instance is not None:
                             card = self.game.card_db.get(item.instance.card_id)
                             if card is not None:
@@ -1464,8 +2005,7 @@ class MTGEngine:
 
     def _resolve_skip_combat(self, player_id: str) -> Dict[str, Any]:
         t = self.game.turn
-        t.phase = Phase.MAIN
-        t.step = Step.MAIN2
+        self._set_step(Phase.MAIN, Step.MAIN2)
         t.attackers = []
         t.blockers = {}
         t.attackers_declared = False
@@ -1477,8 +2017,7 @@ class MTGEngine:
 
     def _resolve_skip_main2(self, player_id: str) -> Dict[str, Any]:
         t = self.game.turn
-        t.phase = Phase.ENDING
-        t.step = Step.END
+        self._set_step(Phase.ENDING, Step.END)
         self._pass_streak = 0
         self._priority_holder = t.active_player_id
         self._log(f"{player_id} skips main 2.")
@@ -1540,6 +2079,11 @@ class MTGEngine:
             if etype == EffectType.MODAL:
                 continue
 
+            handler = self._group_effect_handlers.get(etype)
+            if handler is not None:
+                handler(eff, group, source_instance_id, controller_id)
+                continue
+
             if etype == EffectType.DEAL_DAMAGE:
                 if eff.params.get("requires_optional_cost") and controller_id is not None:
                     options = self._optional_cost_options(controller_id)
@@ -1597,7 +2141,8 @@ class MTGEngine:
                 if target is None or target.get("type") != "PLAYER":
                     continue
                 opponent_id = target.get("player_id")
-                damage = self.game.damage_dealt_to_players.get(opponent_id, 0)
+                opponent = self.game.players.get(opponent_id)
+                damage = opponent.damage_taken_this_turn if opponent is not None else 0
                 options = [{"discard": False}, {"discard": True}]
                 return self._queue_resolution_decision(
                     controller_id,
@@ -1634,13 +2179,10 @@ class MTGEngine:
                 players = [self.game.turn.active_player_id, self._other_player(self.game.turn.active_player_id)]
                 queue = []
                 for pid in players:
-                    creatures = [
-                        perm.instance.instance_id
-                        for perm in self.game.zones.battlefield.values()
-                        if perm.controller_id == pid and self._is_creature(perm)
-                    ]
-                    if creatures:
-                        queue.append({"player_id": pid, "options": creatures})
+                    creature_ids = self._creatures_by_controller.get(pid)
+                    if not creature_ids:
+                        continue
+                    queue.append({"player_id": pid, "options": list(creature_ids)})
                 if queue:
                     first = queue.pop(0)
                     return self._queue_resolution_decision(
@@ -1661,11 +2203,7 @@ class MTGEngine:
             if etype == EffectType.SACRIFICE_TARGET:
                 chooser = eff.params.get("chooser_player_id")
                 if chooser:
-                    options = [
-                        perm.instance.instance_id
-                        for perm in self.game.zones.battlefield.values()
-                        if perm.controller_id == chooser and self._is_creature(perm)
-                    ]
+                    options = list(self._creatures_by_controller.get(chooser, ()))
                     if options:
                         return self._queue_resolution_decision(
                             chooser,
@@ -1706,57 +2244,11 @@ class MTGEngine:
                     self.game.players[controller_id].life += int(amount)
                 continue
 
-            if etype == EffectType.ADD_MANA:
-                self._apply_add_mana(eff, controller_id)
-                continue
-
-            if etype == EffectType.ADD_MANA_PER_ELF:
-                self._apply_add_mana_per_elf(eff, controller_id)
-                continue
-
-            if etype == EffectType.ADD_MANA_PER_TAPPED_LANDS:
-                self._apply_add_mana_per_tapped_lands(eff, controller_id)
-                continue
-
-            if etype == EffectType.CREATE_TOKEN:
-                self._apply_create_token(eff, controller_id, source_instance_id)
-                continue
-
             if etype == EffectType.ATTACK_TAX:
                 duration = eff.params.get("duration", "UNTIL_YOUR_NEXT_TURN")
                 self._add_temporary_effect(eff, controller_id, source_instance_id, duration, None)
                 continue
 
-            if etype == EffectType.DESTROY_CREATURE:
-                for t in group:
-                    self._apply_destroy_creature(eff, t)
-                continue
-
-            if etype == EffectType.DESTROY_ARTIFACT:
-                for t in group:
-                    self._apply_destroy_artifact(t)
-                continue
-
-            if etype == EffectType.DESTROY_FLYING_CREATURE:
-                for t in group:
-                    self._apply_destroy_flying_creature(t)
-                continue
-
-            if etype == EffectType.DESTROY_PERMANENT:
-                for t in group:
-                    self._apply_destroy_permanent_target(t)
-                continue
-
-            if etype == EffectType.EXILE_CREATURE:
-                for t in group:
-                    self._apply_exile_creature(eff, t)
-                continue
-
-            if etype == EffectType.EXILE_TARGET_UNTIL:
-                for t in group:
-                    self._apply_exile_until(eff, t, source_instance_id)
-                continue
-
             if etype == EffectType.SEARCH_BASIC_LAND_TO_BATTLEFIELD_TAPPED:
                 targets_list = self._targets_from_group_or_self(group, eff, source_instance_id)
                 if targets_list:
@@ -1837,32 +2329,6 @@ class MTGEngine:
                 self._resolve_creature_damage(group, trample_excess=True)
                 continue
 
-            if etype == EffectType.RETURN_TO_HAND:
-                for t in group:
-                    self._return_to_hand(t)
-                continue
-
-            if etype == EffectType.RETURN_FROM_GRAVEYARD_TO_HAND:
-                self._return_from_graveyard_to_hand(group, eff, source_instance_id)
-                continue
-
-            if etype == EffectType.RETURN_FROM_GRAVEYARD_TO_BATTLEFIELD_TAPPED:
-                self._return_from_graveyard_to_battlefield_tapped(group, eff, source_instance_id)
-                continue
-
-            if etype == EffectType.RETURN_TWO_DIFFERENT_CONTROLLERS:
-                for t in group:
-                    self._return_to_hand(t)
-                continue
-
-            if etype == EffectType.ATTACH_EQUIPMENT:
-                self._attach_equipment(group, source_instance_id)
-                continue
-
-            if etype == EffectType.ATTACH_ALL_EQUIPMENT:
-                self._attach_all_equipment(group, source_instance_id, controller_id)
-                continue
-
             if etype == EffectType.PUT_COUNTERS:
                 targets_list = self._targets_from_group_or_self(group, eff, source_instance_id)
                 for t in targets_list:
@@ -1895,6 +2361,7 @@ class MTGEngine:
                         continue
                     perm.state.goaded_by = controller_id
                     perm.state.goaded_until_turn = self.game.turn.turn_number + 1
+                    self._invalidate_derived()
                     if eff.params.get("draw_on_attack"):
                         perm.state.draw_on_attack_by = controller_id
                         perm.state.draw_on_attack_until_turn = self.game.turn.turn_number
@@ -1951,8 +2418,9 @@ class MTGEngine:
                     continue
                 top_cards = self._top_library(controller_id, int(eff.params.get("n", 0) or 0))
                 land_choices = []
+                card_db = self.game.card_db
                 for ci in top_cards:
-                    card = self.game.card_db.get(ci.card_id)
+                    card = card_db.get(ci.card_id)
                     if card and CardType.LAND in card.card_types:
                         land_choices.append(ci.instance_id)
                 options = [{"choice": None}] + [{"choice": cid} for cid in land_choices]
@@ -1978,8 +2446,9 @@ class MTGEngine:
                 ps = self._ps(controller_id)
                 keep = []
                 rest = []
+                card_db = self.game.card_db
                 for ci in top_cards:
-                    card = self.game.card_db.get(ci.card_id)
+                    card = card_db.get(ci.card_id)
                     if card and subtype in card.subtypes:
                         keep.append(ci)
                     else:
@@ -2101,14 +2570,10 @@ class MTGEngine:
         if red + any_pool < 1:
             return options
         if red > 0:
-            colored["RED"] = red - 1
-            if colored["RED"] <= 0:
-                colored.pop("RED", None)
+            _set_pool_count(colored, "RED", red - 1)
         else:
-            colored["ANY"] = any_pool - 1
-            if colored["ANY"] <= 0:
-                colored.pop("ANY", None)
-        max_x = generic + sum(int(v) for v in colored.values())
+            _set_pool_count(colored, "ANY", any_pool - 1)
+        max_x = generic + sum(colored.values())
         for x in range(0, max_x + 1):
             options.append({"pay": True, "x": x})
         return options
@@ -2172,7 +2637,7 @@ class MTGEngine:
         meta = {"exile_on_resolve": True}
         if getattr(card.mana_cost, "x", 0):
             meta["x"] = 0
-        self.game.zones.stack.append(
+        self._push_stack(
             StackItem(
                 kind=StackItemKind.SPELL,
                 controller_id=controller_id,
@@ -2187,10 +2652,7 @@ class MTGEngine:
     def _copy_spell(self, target_instance_id: Optional[str], controller_id: Optional[str], targets: Any = None) -> None:
         if target_instance_id is None or controller_id is None:
             return
-        item = next(
-            (s for s in self.game.zones.stack if s.instance is not None and s.instance.instance_id == target_instance_id),
-            None,
-        )
+        item = self._stack_index.get(target_instance_id)
         if item is None or item.instance is None:
             return
         meta = dict(item.meta or {})
@@ -2201,7 +2663,7 @@ class MTGEngine:
             owner_id=controller_id,
             is_token=True,
         )
-        self.game.zones.stack.append(
+        self._push_stack(
             StackItem(
                 kind=StackItemKind.SPELL,
                 controller_id=controller_id,
@@ -2234,26 +2696,20 @@ class MTGEngine:
             return
         condition = eff.params.get("condition")
         if isinstance(condition, dict) and "color" in condition:
-            color = condition.get("color")
-            card = self.game.card_db.get(perm.instance.card_id)
-            if card is None or color not in {c.value for c in card.colors}:
+            color_bit = _COLOR_BITS.get(condition.get("color"), 0)
+            if not self._card_colors.get(perm.instance.card_id, 0) & color_bit:
                 return
         counter_type = eff.params.get("counter")
-        if counter_type not in perm.state.counters:
-            perm.state.counters[counter_type] = 0
+        counter_type = _COUNTER_KEYS.get(counter_type, counter_type)
         amount = eff.params.get("amount", 0)
-        if isinstance(amount, int):
-            perm.state.counters[counter_type] += amount
-            return
-        if amount == "COUNT_ELVES" and controller_id is not None:
-            count = 0
-            for p in self.game.zones.battlefield.values():
-                if p.controller_id != controller_id:
-                    continue
-                card = self.game.card_db.get(p.instance.card_id)
-                if card and "Elf" in card.subtypes:
-                    count += 1
-            perm.state.counters[counter_type] += count
+        if not isinstance(amount, int):
+            if amount == "COUNT_ELVES" and controller_id is not None:
+                amount = self._count_subtype_on_battlefield("Elf", controller_id=controller_id)
+            else:
+                amount = 0
+        counters = perm.state.counters
+        counters[counter_type] = counters.get(counter_type, 0) + amount
+        self._invalidate_derived()
 
     def _add_temporary_effect(
         self,
@@ -2277,6 +2733,7 @@ class MTGEngine:
                 expires_step=expires_step,
             )
         )
+        self._invalidate_derived()
 
     def _duration_to_expiry(self, duration: str, controller_id: Optional[str]) -> tuple[int, Optional[Step]]:
         if duration == "EOT":
@@ -2296,53 +2753,65 @@ class MTGEngine:
     ) -> None:
         amount = eff.params.get("amount", 0)
         if isinstance(amount, str):
-            if amount == "X":
-                amount = int((meta or {}).get("x", 0) or 0)
-            elif amount == "COUNT_DRAGONS":
-                amount = self._count_subtype_on_battlefield("Dragon", controller_id=source_controller_id)
-            elif amount == "COUNT_ELVES":
-                amount = self._count_subtype_on_battlefield("Elf", controller_id=None)
-            elif amount == "COUNT_OTHER_ELVES":
-                amount = self._count_subtype_on_battlefield("Elf", controller_id=None, exclude_id=source_instance_id)
-            else:
-                amount = 0
+            resolver = self._amount_resolvers.get(amount)
+            amount = resolver(meta, source_controller_id, source_instance_id) if resolver is not None else 0
         if not isinstance(amount, int):
             amount = int(amount or 0)
+        if amount <= 0:
+            return
+        target_type = target.get("type")
+        if target_type == "PLAYER":
+            target_id = target.get("player_id")
+        elif target_type == "PERMANENT":
+            target_id = target.get("instance_id")
+        else:
+            return
+        self._deal_damage_direct(amount, target_type, target_id, source_instance_id, source_controller_id)
+
+    def _deal_damage_direct(
+        self,
+        amount: int,
+        target_type: str,
+        target_id: Optional[str],
+        source_instance_id: Optional[str],
+        source_controller_id: Optional[str],
+    ) -> None:
+        """Deal a resolved amount of non-combat damage to a PLAYER or PERMANENT target."""
         if amount <= 0:
             return
         derived = self._derived_battlefield_state()
-        source_keywords = set()
+        source_flags = 0
         if source_instance_id and source_instance_id in derived:
-            source_keywords = derived[source_instance_id]["keywords"]
+            source_flags = derived[source_instance_id].kw_mask
         source_controller = source_controller_id
         if source_controller is None and source_instance_id:
             perm = self.game.zones.battlefield.get(source_instance_id)
             if perm is not None:
                 source_controller = perm.controller_id
 
-        if target.get("type") == "PLAYER":
-            pid = target.get("player_id")
-            if pid in self.game.players:
-                self.game.players[pid].life -= amount
-                self.game.damage_dealt_to_players[pid] = self.game.damage_dealt_to_players.get(pid, 0) + amount
-            if source_controller and Keyword.LIFELINK in source_keywords:
+        if target_type == "PLAYER":
+            pid = target_id
+            ps = self.game.players.get(pid)
+            if ps is not None:
+                ps.life -= amount
+                ps.damage_taken_this_turn += amount
+            if source_controller and source_flags & _LIFELINK_BIT:
                 self.game.players[source_controller].life += amount
-            if pid in self.game.players:
+            if ps is not None:
                 self._handle_you_lose_life(pid, amount)
             return
 
-        if target.get("type") == "PERMANENT":
-            perm = self.game.zones.battlefield.get(target.get("instance_id"))
+        if target_type == "PERMANENT":
+            perm = self.game.zones.battlefield.get(target_id)
             if perm is None:
                 return
             perm.state.damage_marked += amount
-            if source_controller and Keyword.LIFELINK in source_keywords:
+            self._sba_damaged.add(target_id)
+            if source_controller and source_flags & _LIFELINK_BIT:
                 self.game.players[source_controller].life += amount
             self._handle_dealt_damage(perm.instance.instance_id, amount)
-            if Keyword.DEATHTOUCH in source_keywords:
-                self._apply_state_based_actions({perm.instance.instance_id})
-            else:
-                self._apply_state_based_actions()
+            if source_flags & _DEATHTOUCH_BIT:
+                self._sba_deathtouch_pending.add(perm.instance.instance_id)
 
     def _apply_draw_cards(self, eff: Any, target: Dict[str, Any]) -> None:
         amount = int(eff.params.get("amount", 0))
@@ -2374,33 +2843,27 @@ class MTGEngine:
         mana = eff.params.get("mana")
         if mana is None:
             return
-        ps = self._ps(controller_id)
+        colored = self._ps(controller_id).mana_pool.colored
 
         if isinstance(mana, dict):
             for color, amount in mana.items():
-                ps.mana_pool.colored[color] = ps.mana_pool.colored.get(color, 0) + int(amount)
+                colored[color] = colored.get(color, 0) + int(amount)
             return
 
         if isinstance(mana, str):
             if mana.upper() == "ANY":
-                ps.mana_pool.colored["ANY"] = ps.mana_pool.colored.get("ANY", 0) + 1
+                colored["ANY"] = colored.get("ANY", 0) + 1
                 return
-            for ch in mana:
-                color = {"W": "WHITE", "U": "BLUE", "B": "BLACK", "R": "RED", "G": "GREEN"}.get(ch)
+            for ch, count in Counter(mana).items():
+                color = _MANA_SYMBOL_COLORS.get(ch)
                 if color:
-                    ps.mana_pool.colored[color] = ps.mana_pool.colored.get(color, 0) + 1
+                    colored[color] = colored.get(color, 0) + count
 
     def _apply_add_mana_per_elf(self, eff: Any, controller_id: Optional[str]) -> None:
         if controller_id is None:
             return
         color = eff.params.get("color", "G")
-        count = 0
-        for perm in self.game.zones.battlefield.values():
-            if perm.controller_id != controller_id:
-                continue
-            card = self.game.card_db.get(perm.instance.card_id)
-            if card and "Elf" in card.subtypes:
-                count += 1
+        count = self._count_subtype_on_battlefield("Elf", controller_id=controller_id)
         if count > 0:
             self._apply_add_mana(Effect(type=EffectType.ADD_MANA, params={"mana": color * count}), controller_id)
 
@@ -2409,12 +2872,13 @@ class MTGEngine:
             return
         color = eff.params.get("color", "R")
         count = 0
-        for perm in self.game.zones.battlefield.values():
-            if perm.controller_id == controller_id:
+        land_ids = self._card_ids_by_type.get(CardType.LAND, frozenset())
+        for pid, perms in self._bf_by_controller.items():
+            if pid == controller_id:
                 continue
-            card = self.game.card_db.get(perm.instance.card_id)
-            if card and CardType.LAND in card.card_types and perm.state.tapped:
-                count += 1
+            for perm in perms.values():
+                if perm.state.tapped and perm.instance.card_id in land_ids:
+                    count += 1
         if count > 0:
             self._apply_add_mana(Effect(type=EffectType.ADD_MANA, params={"mana": color * count}), controller_id)
 
@@ -2432,32 +2896,16 @@ class MTGEngine:
 
         condition = eff.params.get("condition")
         if condition == "CONTROL_EQUIPMENT":
-            if not any(
-                self.game.card_db.get(p.instance.card_id, None) and self.game.card_db[p.instance.card_id].equipment_stats is not None
-                for p in self.game.zones.battlefield.values()
-                if p.controller_id == controller_id
-            ):
+            equipment_ids = self._equipment_card_ids
+            if not any(p.instance.card_id in equipment_ids for p in self._controlled_permanents(controller_id)):
                 return
         if condition == "CONTROL_ANOTHER_ELF":
-            count = 0
-            for p in self.game.zones.battlefield.values():
-                if p.controller_id != controller_id:
-                    continue
-                card = self.game.card_db.get(p.instance.card_id)
-                if card and "Elf" in card.subtypes:
-                    count += 1
-            if count <= 1:
+            if self._count_subtype_on_battlefield("Elf", controller_id=controller_id) <= 1:
                 return
 
         count = eff.params.get("count", 1)
         if count == "PER_ELF_YOU_CONTROL":
-            count = 0
-            for p in self.game.zones.battlefield.values():
-                if p.controller_id != controller_id:
-                    continue
-                card = self.game.card_db.get(p.instance.card_id)
-                if card and "Elf" in card.subtypes:
-                    count += 1
+            count = self._count_subtype_on_battlefield("Elf", controller_id=controller_id)
 
         count = int(count) if isinstance(count, int) or isinstance(count, str) else 1
         created_ids = []
@@ -2473,7 +2921,7 @@ class MTGEngine:
                 instance=token_ci,
                 controller_id=controller_id,
             )
-            self.game.zones.battlefield[instance_id] = perm
+            self._put_onto_battlefield(perm)
             created_ids.append(instance_id)
             self._handle_etb(perm)
             self._handle_creature_enters(perm)
@@ -2482,6 +2930,7 @@ class MTGEngine:
             source_perm = self.game.zones.battlefield.get(source_instance_id)
             if source_perm is not None:
                 source_perm.state.attached_to = created_ids[0]
+                self._attachments_changed()
 
     def _apply_destroy_creature(self, eff: Any, target: Dict[str, Any]) -> None:
         if target.get("type") != "PERMANENT":
@@ -2494,10 +2943,10 @@ class MTGEngine:
         derived = self._derived_battlefield_state()
         d = derived.get(perm.instance.instance_id)
         min_toughness = eff.params.get("min_toughness")
-        if d and min_toughness is not None and d.get("toughness") is not None:
-            if int(d["toughness"]) < int(min_toughness):
+        if d and min_toughness is not None and d.toughness is not None:
+            if int(d.toughness) < int(min_toughness):
                 return
-        if d and Keyword.INDESTRUCTIBLE in d["keywords"]:
+        if d and d.kw_mask & _INDESTRUCTIBLE_BIT:
             return
         self._destroy_permanent(perm)
 
@@ -2507,24 +2956,95 @@ class MTGEngine:
         perm = self.game.zones.battlefield.get(target.get("instance_id"))
         if perm is None:
             return
-        card = self.game.card_db.get(perm.instance.card_id)
-        if card is None or CardType.ARTIFACT not in card.card_types:
+        if not self._is_artifact(perm):
             return
         derived = self._derived_battlefield_state()
         d = derived.get(perm.instance.instance_id)
-        if d and Keyword.INDESTRUCTIBLE in d["keywords"]:
+        if d and d.kw_mask & _INDESTRUCTIBLE_BIT:
             return
         self._destroy_permanent(perm)
 
-    def _destroy_permanent(self, perm: Permanent) -> None:
-        self._handle_dies(perm)
-        self._return_exiled_for_source(perm.instance.instance_id)
-        self.game.zones.battlefield.pop(perm.instance.instance_id, None)
-        if perm.instance.is_token:
+    def _check_known_card(self, perm: Permanent) -> None:
+        # Trigger handlers and the per-card lookup tables index by card_id without a fallback.
+        if perm.instance.card_id not in self.game.card_db:
+            raise ValueError(f"Unknown card_id for permanent: {perm.instance.card_id}")
+
+    def _put_onto_battlefield(self, perm: Permanent) -> None:
+        # Every new permanent enters here, and controllers never change afterwards.
+        self._check_known_card(perm)
+        perm.controller_id = self._player_ids.get(perm.controller_id, perm.controller_id)
+        self.game.zones.battlefield[perm.instance.instance_id] = perm
+        self._index_permanent(perm)
+        self._attachments_changed()
+
+    def _remove_from_battlefield(self, perm: Permanent) -> None:
+        instance_id = perm.instance.instance_id
+        if self.game.zones.battlefield.pop(instance_id, None) is None:
             return
-        owner = perm.instance.owner_id
-        if owner in self.game.players:
-            self.game.players[owner].graveyard.append(perm.instance)
+        self._attachments_changed()
+        self._bf_by_controller.get(perm.controller_id, {}).pop(instance_id, None)
+        creatures = self._creatures_by_controller.get(perm.controller_id)
+        if creatures is not None:
+            creatures.pop(instance_id, None)
+        card = self.game.card_db.get(perm.instance.card_id)
+        if card is not None:
+            for subtype in card.subtypes:
+                self._subtype_index.get(subtype, {}).get(perm.controller_id, {}).pop(instance_id, None)
+        reducers = self._cost_reducers.get(perm.controller_id)
+        if reducers is not None:
+            reducers.pop(instance_id, None)
+        for trigger in self._card_trigger_types.get(perm.instance.card_id, ()):
+            self._bf_by_trigger[trigger].pop(instance_id, None)
+            self._bf_by_trigger_controller[(trigger, perm.controller_id)].pop(instance_id, None)
+        self._bf_other_dies_watchers.pop(instance_id, None)
+        self._bf_static_sources.pop(instance_id, None)
+
+    def _index_permanent(self, perm: Permanent) -> None:
+        instance_id = perm.instance.instance_id
+        self._bf_by_controller.setdefault(perm.controller_id, {})[instance_id] = perm
+        card = self.game.card_db[perm.instance.card_id]
+        if CardType.CREATURE in card.card_types:
+            self._creatures_by_controller.setdefault(perm.controller_id, {})[instance_id] = None
+        for subtype in card.subtypes:
+            self._subtype_index.setdefault(subtype, {}).setdefault(perm.controller_id, {})[instance_id] = None
+        reductions = self._cost_reductions_by_card.get(perm.instance.card_id)
+        if reductions:
+            self._cost_reducers.setdefault(perm.controller_id, {})[instance_id] = reductions
+        for trigger in self._card_trigger_types.get(perm.instance.card_id, ()):
+            self._bf_by_trigger.setdefault(trigger, {})[instance_id] = perm
+            self._bf_by_trigger_controller.setdefault((trigger, perm.controller_id), {})[instance_id] = perm
+        other_dies = self._card_other_dies_triggers.get(perm.instance.card_id)
+        if other_dies:
+            kinds = self._card_other_dies_kinds[perm.instance.card_id]
+            self._bf_other_dies_watchers[instance_id] = (perm, perm.controller_id, kinds, other_dies)
+        if perm.instance.card_id in self._card_static_effects:
+            self._bf_static_sources[instance_id] = perm
+
+    def _destroy_permanent(self, perm: Permanent, derived: Optional[Dict[str, _DerivedPerm]] = None) -> None:
+        self._handle_dies(perm, derived)
+        self._move_permanent(perm, "GRAVEYARD")
+
+    def _move_permanent(self, perm: Permanent, to_zone: str) -> bool:
+        """
+        Move a permanent off the battlefield into its owner's GRAVEYARD / HAND or into EXILE.
+        Cards it exiled come back first; tokens cease to exist. Returns True if the card landed.
+        """
+        instance = perm.instance
+        self._return_exiled_for_source(instance.instance_id)
+        self._remove_from_battlefield(perm)
+        if instance.is_token:
+            return False
+        if to_zone == "EXILE":
+            self.game.zones.exile[instance.instance_id] = instance
+            return True
+        owner = self.game.players.get(instance.owner_id)
+        if owner is None:
+            return False
+        if to_zone == "HAND":
+            owner.hand.append(instance)
+        else:
+            owner.graveyard.append(instance)
+        return True
 
     def _apply_destroy_flying_creature(self, target: Dict[str, Any]) -> None:
         if target.get("type") != "PERMANENT":
@@ -2534,9 +3054,9 @@ class MTGEngine:
             return
         derived = self._derived_battlefield_state()
         d = derived.get(perm.instance.instance_id)
-        if d is None or Keyword.FLYING not in d.get("keywords", set()):
+        if d is None or not d.kw_mask & _FLYING_BIT:
             return
-        if Keyword.INDESTRUCTIBLE in d.get("keywords", set()):
+        if d.kw_mask & _INDESTRUCTIBLE_BIT:
             return
         self._destroy_permanent(perm)
 
@@ -2548,7 +3068,7 @@ class MTGEngine:
             return
         derived = self._derived_battlefield_state()
         d = derived.get(perm.instance.instance_id)
-        if d and Keyword.INDESTRUCTIBLE in d.get("keywords", set()):
+        if d and d.kw_mask & _INDESTRUCTIBLE_BIT:
             return
         self._destroy_permanent(perm)
 
@@ -2562,14 +3082,10 @@ class MTGEngine:
         d = derived.get(perm.instance.instance_id)
         if eff.params.get("gain_life_equal_power") and perm.controller_id in self.game.players:
             power = 0
-            if d and d.get("power") is not None:
-                power = int(d["power"])
+            if d and d.power is not None:
+                power = int(d.power)
             self.game.players[perm.controller_id].life += power
-        self._return_exiled_for_source(perm.instance.instance_id)
-        self.game.zones.battlefield.pop(perm.instance.instance_id, None)
-        if perm.instance.is_token:
-            return
-        self.game.zones.exile[perm.instance.instance_id] = perm.instance
+        self._move_permanent(perm, "EXILE")
 
     def _apply_exile_until(self, eff: Any, target: Dict[str, Any], source_instance_id: Optional[str]) -> None:
         if target.get("type") != "PERMANENT":
@@ -2577,57 +3093,70 @@ class MTGEngine:
         perm = self.game.zones.battlefield.get(target.get("instance_id"))
         if perm is None:
             return
-        self._return_exiled_for_source(perm.instance.instance_id)
-        self.game.zones.battlefield.pop(perm.instance.instance_id, None)
-        if perm.instance.is_token:
+        if not self._move_permanent(perm, "EXILE"):
             return
-        self.game.zones.exile[perm.instance.instance_id] = perm.instance
         if source_instance_id:
-            self.game.exile_links[perm.instance.instance_id] = source_instance_id
+            self._link_exiled(perm.instance.instance_id, source_instance_id)
+
+    def _link_exiled(self, exiled_id: str, source_instance_id: str) -> None:
+        """Record that exiled_id returns when source_instance_id leaves, in both link maps."""
+        previous = self.game.exile_links.pop(exiled_id, None)
+        if previous is not None:
+            self._exiled_by_source.get(previous, {}).pop(exiled_id, None)
+        self.game.exile_links[exiled_id] = source_instance_id
+        self._exiled_by_source.setdefault(source_instance_id, {})[exiled_id] = None
+
+    def _library_choices(self, player_id: str, card_ids: FrozenSet[str]) -> List[Dict[str, Any]]:
+        """A decline option followed by every library card whose card_id is in card_ids, in library order."""
+        options: List[Dict[str, Any]] = [{"choice": None}]
+        options.extend({"choice": ci.instance_id} for ci in self._ps(player_id).library if ci.card_id in card_ids)
+        return options
 
     def _basic_land_choices(self, player_id: str) -> List[Dict[str, Any]]:
-        ps = self._ps(player_id)
-        options = [{"choice": None}]
-        for ci in ps.library:
-            card = self.game.card_db.get(ci.card_id)
-            if card and CardType.LAND in card.card_types and ci.card_id.startswith("basic_"):
-                options.append({"choice": ci.instance_id})
-        return options
+        return self._library_choices(player_id, self._basic_land_card_ids)
 
     def _basic_plains_choices(self, player_id: str) -> List[Dict[str, Any]]:
-        ps = self._ps(player_id)
-        options = [{"choice": None}]
-        for ci in ps.library:
-            card = self.game.card_db.get(ci.card_id)
-            if card and CardType.LAND in card.card_types:
-                if LandType.PLAINS in (card.land_stats.land_types if card.land_stats else set()):
-                    options.append({"choice": ci.instance_id})
-        return options
+        return self._library_choices(player_id, self._plains_card_ids)
+
+    def _push_stack(self, item: StackItem) -> None:
+        self.game.zones.stack.append(item)
+        if item.instance is not None:
+            self._stack_index[item.instance.instance_id] = item
+
+    def _pop_stack(self, item: Optional[StackItem] = None) -> StackItem:
+        stack = self.game.zones.stack
+        if item is None:
+            item = stack.pop()
+        else:
+            for i in range(len(stack) - 1, -1, -1):
+                if stack[i] is item:
+                    del stack[i]
+                    break
+        if item.instance is not None:
+            self._stack_index.pop(item.instance.instance_id, None)
+        return item
 
     def _stack_item_controller(self, instance_id: Optional[str]) -> Optional[str]:
         if instance_id is None:
             return None
-        for item in self.game.zones.stack:
-            if item.instance is not None and item.instance.instance_id == instance_id:
-                return item.controller_id
-        return None
+        item = self._stack_index.get(instance_id)
+        return item.controller_id if item is not None else None
 
     def _counter_spell(self, instance_id: Optional[str]) -> None:
         if instance_id is None:
             return
-        for i, item in enumerate(self.game.zones.stack):
-            if item.instance is None or item.instance.instance_id != instance_id:
-                continue
-            self.game.zones.stack.pop(i)
-            if item.meta and item.meta.get("is_copy"):
-                return
-            if item.meta and item.meta.get("exile_on_resolve"):
-                self.game.zones.exile[item.instance.instance_id] = item.instance
-                return
-            owner = item.instance.owner_id
-            if owner in self.game.players:
-                self.game.players[owner].graveyard.append(item.instance)
+        item = self._stack_index.get(instance_id)
+        if item is None:
+            return
+        self._pop_stack(item)
+        if item.meta and item.meta.get("is_copy"):
+            return
+        if item.meta and item.meta.get("exile_on_resolve"):
+            self.game.zones.exile[item.instance.instance_id] = item.instance
             return
+        owner = item.instance.owner_id
+        if owner in self.game.players:
+            self.game.players[owner].graveyard.append(item.instance)
 
     def _return_to_hand(self, target: Dict[str, Any]) -> None:
         if target.get("type") != "PERMANENT":
@@ -2635,13 +3164,7 @@ class MTGEngine:
         perm = self.game.zones.battlefield.get(target.get("instance_id"))
         if perm is None:
             return
-        self._return_exiled_for_source(perm.instance.instance_id)
-        self.game.zones.battlefield.pop(perm.instance.instance_id, None)
-        if perm.instance.is_token:
-            return
-        owner = perm.instance.owner_id
-        if owner in self.game.players:
-            self.game.players[owner].hand.append(perm.instance)
+        self._move_permanent(perm, "HAND")
 
     def _return_from_graveyard_to_hand(
         self,
@@ -2650,27 +3173,14 @@ class MTGEngine:
         source_instance_id: Optional[str],
     ) -> None:
         if group:
-            for target in group:
-                if target.get("type") != "CARD":
-                    continue
-                pid = target.get("player_id")
-                if pid not in self.game.players:
-                    continue
-                ps = self._ps(pid)
-                for i, ci in enumerate(ps.graveyard):
-                    if ci.instance_id == target.get("instance_id"):
-                        ps.graveyard.pop(i)
-                        ps.hand.append(ci)
-                        break
+            for ps, ci in self._take_targets_from_graveyards(group):
+                ps.hand.append(ci)
             return
         target = eff.params.get("target")
         if target == "SELF" and source_instance_id:
-            for ps in self.game.players.values():
-                for i, ci in enumerate(ps.graveyard):
-                    if ci.instance_id == source_instance_id:
-                        ps.graveyard.pop(i)
-                        ps.hand.append(ci)
-                        return
+            found = self._take_from_any_graveyard(source_instance_id)
+            if found is not None:
+                found[0].hand.append(found[1])
 
     def _return_from_graveyard_to_battlefield_tapped(
         self,
@@ -2681,32 +3191,57 @@ class MTGEngine:
         def move_card(ci: CardInstance) -> None:
             perm = Permanent(instance=ci, controller_id=ci.owner_id)
             perm.state.tapped = True
-            self.game.zones.battlefield[ci.instance_id] = perm
+            self._put_onto_battlefield(perm)
             self._handle_etb(perm)
             self._handle_creature_enters(perm)
 
         if group:
-            for target in group:
-                if target.get("type") != "CARD":
-                    continue
-                pid = target.get("player_id")
-                if pid not in self.game.players:
-                    continue
-                ps = self._ps(pid)
-                for i, ci in enumerate(ps.graveyard):
-                    if ci.instance_id == target.get("instance_id"):
-                        ps.graveyard.pop(i)
-                        move_card(ci)
-                        break
+            for _, ci in self._take_targets_from_graveyards(group):
+                move_card(ci)
             return
         target = eff.params.get("target")
         if target == "SELF" and source_instance_id:
-            for ps in self.game.players.values():
-                for i, ci in enumerate(ps.graveyard):
-                    if ci.instance_id == source_instance_id:
-                        ps.graveyard.pop(i)
-                        move_card(ci)
-                        return
+            found = self._take_from_any_graveyard(source_instance_id)
+            if found is not None:
+                move_card(found[1])
+
+    def _take_targets_from_graveyards(self, group: List[Dict[str, Any]]) -> List[Tuple[PlayerState, CardInstance]]:
+        """
+        Remove every CARD target in group from its player's graveyard with one pass per
+        graveyard. Returns (owner state, card) pairs in group order; missing cards are skipped.
+        """
+        wanted: Dict[str, set] = {}
+        for target in group:
+            if target.get("type") == "CARD" and target.get("player_id") in self.game.players:
+                wanted.setdefault(target["player_id"], set()).add(target.get("instance_id"))
+        taken: Dict[str, CardInstance] = {}
+        for pid, ids in wanted.items():
+            ps = self._ps(pid)
+            keep: List[CardInstance] = []
+            for ci in ps.graveyard:
+                if ci.instance_id in ids and ci.instance_id not in taken:
+                    taken[ci.instance_id] = ci
+                else:
+                    keep.append(ci)
+            if len(keep) != len(ps.graveyard):
+                ps.graveyard[:] = keep
+        moved: List[Tuple[PlayerState, CardInstance]] = []
+        for target in group:
+            if target.get("type") != "CARD" or target.get("player_id") not in self.game.players:
+                continue
+            ci = taken.pop(target.get("instance_id"), None)
+            if ci is not None:
+                moved.append((self._ps(target["player_id"]), ci))
+        return moved
+
+    def _take_from_any_graveyard(self, instance_id: str) -> Optional[Tuple[PlayerState, CardInstance]]:
+        for ps in self.game.players.values():
+            graveyard = ps.graveyard
+            # Newest cards sit at the end; self-returning cards are usually the most recent.
+            for i in range(len(graveyard) - 1, -1, -1):
+                if graveyard[i].instance_id == instance_id:
+                    return ps, graveyard.pop(i)
+        return None
 
     def _attach_equipment(self, group: List[Dict[str, Any]], source_instance_id: Optional[str]) -> None:
         equipment_id = None
@@ -2730,6 +3265,7 @@ class MTGEngine:
         if not self._is_creature(target):
             return
         equipment.state.attached_to = target_id
+        self._attachments_changed()
 
     def _attach_all_equipment(
         self,
@@ -2747,14 +3283,11 @@ class MTGEngine:
         target = self.game.zones.battlefield.get(target_id)
         if target is None or not self._is_creature(target):
             return
-        for perm in self.game.zones.battlefield.values():
-            if perm.controller_id != controller_id:
-                continue
-            card = self.game.card_db.get(perm.instance.card_id)
-            if card is None:
-                continue
-            if card.equipment_stats is not None or card.aura_stats is not None:
+        attachment_ids = self._attachment_card_ids
+        for perm in self._controlled_permanents(controller_id):
+            if perm.instance.card_id in attachment_ids:
                 perm.state.attached_to = target_id
+                self._attachments_changed()
 
     def _materialize_pt_amount(self, eff: Any, source_instance_id: Optional[str]) -> Any:
         amount = eff.params.get("amount")
@@ -2781,29 +3314,22 @@ class MTGEngine:
         derived = self._derived_battlefield_state()
         d_source = derived.get(source_perm.instance.instance_id)
         d_target = derived.get(target_perm.instance.instance_id)
-        if d_source is None or d_source.get("power") is None:
+        if d_source is None or d_source.power is None:
             return
-        power = int(d_source["power"])
-        self._apply_deal_damage(
-            Effect(EffectType.DEAL_DAMAGE, {"amount": power}),
-            {"type": "PERMANENT", "instance_id": target_perm.instance.instance_id},
-            source_perm.instance.instance_id,
-            source_perm.controller_id,
-            meta=None,
+        power = int(d_source.power)
+        source_id = source_perm.instance.instance_id
+        self._deal_damage_direct(
+            power, "PERMANENT", target_perm.instance.instance_id, source_id, source_perm.controller_id
         )
-        if trample_excess and Keyword.TRAMPLE in d_source.get("keywords", set()):
-            if d_target and d_target.get("toughness") is not None:
-                lethal = int(d_target["toughness"]) - int(target_perm.state.damage_marked)
-                if Keyword.DEATHTOUCH in d_source.get("keywords", set()):
+        if trample_excess and d_source.kw_mask & _TRAMPLE_BIT:
+            if d_target and d_target.toughness is not None:
+                lethal = int(d_target.toughness) - int(target_perm.state.damage_marked)
+                if d_source.kw_mask & _DEATHTOUCH_BIT:
                     lethal = 1
                 excess = max(0, power - max(0, lethal))
                 if excess > 0:
-                    self._apply_deal_damage(
-                        Effect(EffectType.DEAL_DAMAGE, {"amount": excess}),
-                        {"type": "PLAYER", "player_id": target_perm.controller_id},
-                        source_perm.instance.instance_id,
-                        source_perm.controller_id,
-                        meta=None,
+                    self._deal_damage_direct(
+                        excess, "PLAYER", target_perm.controller_id, source_id, source_perm.controller_id
                     )
 
     def _top_library(self, player_id: str, n: int) -> List[CardInstance]:
@@ -2814,40 +3340,37 @@ class MTGEngine:
 
     def _remove_from_library(self, ps: PlayerState, cards: List[CardInstance]) -> None:
         ids = {ci.instance_id for ci in cards}
-        ps.library = [ci for ci in ps.library if ci.instance_id not in ids]
+        if not ids:
+            return
+        # Cards almost always come from _top_library, i.e. the tail of the list.
+        k = len(ids)
+        if len(ps.library) >= k and all(ci.instance_id in ids for ci in ps.library[-k:]):
+            del ps.library[-k:]
+            return
+        ps.library[:] = [ci for ci in ps.library if ci.instance_id not in ids]
 
     def _put_on_bottom(self, ps: PlayerState, cards: List[CardInstance]) -> None:
-        ps.library = list(cards) + ps.library
+        ps.library[:0] = cards
 
     def _scry_options(self, top_cards: List[CardInstance]) -> List[Dict[str, Any]]:
         ids = [ci.instance_id for ci in top_cards]
         if not ids:
             return []
-        options: List[Dict[str, Any]] = []
-        for perm in itertools.permutations(ids, len(ids)):
-            for split in range(len(ids) + 1):
-                top = list(perm[: len(ids) - split])
-                bottom = list(perm[len(ids) - split :])
-                options.append({"top": top, "bottom": bottom})
-        return options
+        return [
+            {"top": [ids[i] for i in top], "bottom": [ids[i] for i in bottom]}
+            for top, bottom in _scry_layouts(len(ids))
+        ]
 
     def _fact_or_fiction_partitions(self, top_cards: List[CardInstance]) -> List[Dict[str, Any]]:
         ids = [ci.instance_id for ci in top_cards]
         if not ids:
             return []
-        options: List[Dict[str, Any]] = []
         if len(ids) == 1:
             return [{"pile_a": ids, "pile_b": []}]
-        for mask in range(1 << (len(ids) - 1)):
-            pile_a = [ids[0]]
-            pile_b = []
-            for i, cid in enumerate(ids[1:], start=1):
-                if mask & (1 << (i - 1)):
-                    pile_a.append(cid)
-                else:
-                    pile_b.append(cid)
-            options.append({"pile_a": pile_a, "pile_b": pile_b})
-        return options
+        return [
+            {"pile_a": [ids[i] for i in pile_a], "pile_b": [ids[i] for i in pile_b]}
+            for pile_a, pile_b in _fact_or_fiction_layouts(len(ids))
+        ]
 
     def _vote_options(self, vote_type: str) -> List[str]:
         if vote_type == "PLEA_FOR_POWER":
@@ -2859,153 +3382,154 @@ class MTGEngine:
     def _opponent_graveyard_spell_choices(self, opponent_id: str) -> List[Dict[str, Any]]:
         options = [{"choice": None}]
         ps = self._ps(opponent_id)
+        spell_ids = self._instant_or_sorcery_card_ids
         for ci in ps.graveyard:
-            card = self.game.card_db.get(ci.card_id)
-            if card is None:
-                continue
-            if CardType.INSTANT in card.card_types or CardType.SORCERY in card.card_types:
+            if ci.card_id in spell_ids:
                 options.append({"choice": ci.instance_id})
         return options
 
     def _resolve_combat_damage(self) -> None:
         t = self.game.turn
+        battlefield = self.game.zones.battlefield
         defending_player = self._other_player(t.active_player_id)
         derived = self._derived_battlefield_state()
 
-        def deals_in_first_strike_step(d: Dict[str, Any]) -> bool:
-            return Keyword.FIRST_STRIKE in d["keywords"] or Keyword.DOUBLE_STRIKE in d["keywords"]
+        # Per-combat snapshots shared by both damage steps; each step only re-checks that
+        # the creature is still on the battlefield.
+        # Each attacker carries its blockers as (blocker_id, toughness), toughness None when the
+        # blocker can't be assigned damage; it still counts as blocking while on the battlefield.
+        attacker_snapshots: List[Tuple[str, str, Dict[str, Any], int, List[Tuple[str, Optional[int]]]]] = []
+        for attacker_id in t.attackers:
+            attacker = battlefield.get(attacker_id)
+            d_att = derived.get(attacker_id)
+            if attacker is None or d_att is None or d_att.power is None:
+                continue
+            att_prevented = d_att.prevent_combat_damage
+            blocked_by: List[Tuple[str, Optional[int]]] = []
+            for blocker_id in t.blockers.get(attacker_id, []):
+                d_blk = derived.get(blocker_id)
+                toughness = None
+                if d_blk is not None and d_blk.toughness is not None and not att_prevented:
+                    if not d_blk.prevent_combat_damage:
+                        toughness = int(d_blk.toughness)
+                blocked_by.append((blocker_id, toughness))
+            snapshot = (attacker_id, attacker.controller_id, d_att, d_att.kw_mask, blocked_by)
+            attacker_snapshots.append(snapshot)
+        # Blocks that can deal damage, flattened to (attacker_id, blocker_id, controller, flags, power)
+        # in declaration order.
+        block_pairs: List[Tuple[str, str, str, int, int]] = []
+        for attacker_id, blocker_ids in t.blockers.items():
+            d_att = derived.get(attacker_id)
+            if attacker_id not in battlefield or d_att is None or d_att.toughness is None:
+                continue
+            if d_att.prevent_combat_damage:
+                continue
+            for blocker_id in blocker_ids:
+                blocker = battlefield.get(blocker_id)
+                d_blk = derived.get(blocker_id)
+                if blocker is None or d_blk is None or d_blk.power is None:
+                    continue
+                if d_blk.prevent_combat_damage:
+                    continue
+                block_pairs.append(
+                    (attacker_id, blocker_id, blocker.controller_id, d_blk.kw_mask, int(d_blk.power))
+                )
 
-        def deals_in_normal_step(d: Dict[str, Any]) -> bool:
-            if Keyword.DOUBLE_STRIKE in d["keywords"]:
-                return True
-            return Keyword.FIRST_STRIKE not in d["keywords"]
+        # First or double strike deals in the first-strike step; anything but first strike
+        # alone deals in the regular step.
+        first_strike_dealers: set[str] = set()
+        normal_step_dealers: set[str] = set()
+        strike_flags = [(snapshot[0], snapshot[3]) for snapshot in attacker_snapshots]
+        strike_flags.extend((pair[1], pair[3]) for pair in block_pairs)
+        for creature_id, flags in strike_flags:
+            strike = flags & _STRIKE_BITS
+            if strike:
+                first_strike_dealers.add(creature_id)
+            if strike != _FIRST_STRIKE_BIT:
+                normal_step_dealers.add(creature_id)
 
         def combat_damage_step(first_strike: bool) -> None:
-            damage_events: List[Dict[str, Any]] = []
+            dealers = first_strike_dealers if first_strike else normal_step_dealers
+            damage_events: List[_DamageEvent] = []
             deathtouch_marked: set[str] = set()
 
             # Attacker damage
-            for attacker_id in t.attackers:
-                attacker = self.game.zones.battlefield.get(attacker_id)
-                if attacker is None:
-                    continue
-                d_att = derived.get(attacker_id)
-                if d_att is None or d_att["power"] is None:
-                    continue
-                if first_strike and not deals_in_first_strike_step(d_att):
-                    continue
-                if not first_strike and not deals_in_normal_step(d_att):
+            for attacker_id, controller, d_att, att_flags, blocked_by in attacker_snapshots:
+                if attacker_id not in dealers or attacker_id not in battlefield:
                     continue
 
-                blockers = [bid for bid in t.blockers.get(attacker_id, []) if bid in self.game.zones.battlefield]
-                assign_unblocked = bool(d_att.get("assign_damage_as_unblocked", False))
-                damage_to_blockers = [] if assign_unblocked else blockers
+                damage_to_blockers = []
+                if not d_att.assign_damage_as_unblocked:
+                    damage_to_blockers = [b for b in blocked_by if b[0] in battlefield]
 
                 if not damage_to_blockers:
-                    if not d_att.get("prevent_combat_damage", False):
+                    if not d_att.prevent_combat_damage:
+                        power = int(d_att.power)
                         damage_events.append(
-                            {
-                                "source_id": attacker_id,
-                                "source_controller": attacker.controller_id,
-                                "source_keywords": d_att["keywords"],
-                                "target_type": "PLAYER",
-                                "target_id": defending_player,
-                                "amount": int(d_att["power"]),
-                            }
+                            _DamageEvent(
+                                attacker_id, controller, att_flags, _TARGET_PLAYER, defending_player, power
+                            )
                         )
                 else:
-                    remaining = int(d_att["power"])
-                    for blocker_id in damage_to_blockers:
-                        d_blk = derived.get(blocker_id)
-                        if d_blk is None or d_blk["toughness"] is None:
-                            continue
-                        if d_blk.get("prevent_combat_damage", False) or d_att.get("prevent_combat_damage", False):
+                    remaining = int(d_att.power)
+                    for blocker_id, toughness in damage_to_blockers:
+                        if toughness is None:
                             continue
-                        lethal = 1 if Keyword.DEATHTOUCH in d_att["keywords"] else int(d_blk["toughness"])
+                        lethal = 1 if att_flags & _DEATHTOUCH_BIT else toughness
                         assign = min(remaining, lethal)
                         if assign > 0:
                             damage_events.append(
-                                {
-                                    "source_id": attacker_id,
-                                    "source_controller": attacker.controller_id,
-                                    "source_keywords": d_att["keywords"],
-                                    "target_type": "CREATURE",
-                                    "target_id": blocker_id,
-                                    "amount": assign,
-                                }
+                                _DamageEvent(
+                                    attacker_id, controller, att_flags, _TARGET_CREATURE, blocker_id, assign
+                                )
                             )
-                            if Keyword.DEATHTOUCH in d_att["keywords"]:
+                            if att_flags & _DEATHTOUCH_BIT:
                                 deathtouch_marked.add(blocker_id)
                         remaining -= assign
                         if remaining <= 0:
                             break
-                    if remaining > 0 and Keyword.TRAMPLE in d_att["keywords"]:
+                    if remaining > 0 and att_flags & _TRAMPLE_BIT:
                         damage_events.append(
-                            {
-                                "source_id": attacker_id,
-                                "source_controller": attacker.controller_id,
-                                "source_keywords": d_att["keywords"],
-                                "target_type": "PLAYER",
-                                "target_id": defending_player,
-                                "amount": remaining,
-                            }
+                            _DamageEvent(
+                                attacker_id, controller, att_flags, _TARGET_PLAYER, defending_player, remaining
+                            )
                         )
 
             # Blocker damage
-            for attacker_id, blocker_ids in t.blockers.items():
-                attacker = self.game.zones.battlefield.get(attacker_id)
-                if attacker is None:
-                    continue
-                d_att = derived.get(attacker_id)
-                if d_att is None or d_att["toughness"] is None:
+            for attacker_id, blocker_id, controller, blk_flags, power in block_pairs:
+                if blocker_id not in dealers or attacker_id not in battlefield or blocker_id not in battlefield:
                     continue
-                for blocker_id in blocker_ids:
-                    blocker = self.game.zones.battlefield.get(blocker_id)
-                    if blocker is None:
-                        continue
-                    d_blk = derived.get(blocker_id)
-                    if d_blk is None or d_blk["power"] is None:
-                        continue
-                    if first_strike and not deals_in_first_strike_step(d_blk):
-                        continue
-                    if not first_strike and not deals_in_normal_step(d_blk):
-                        continue
-                    if d_blk.get("prevent_combat_damage", False) or d_att.get("prevent_combat_damage", False):
-                        continue
-                    damage_events.append(
-                        {
-                            "source_id": blocker_id,
-                            "source_controller": blocker.controller_id,
-                            "source_keywords": d_blk["keywords"],
-                            "target_type": "CREATURE",
-                            "target_id": attacker_id,
-                            "amount": int(d_blk["power"]),
-                        }
-                    )
-                    if Keyword.DEATHTOUCH in d_blk["keywords"]:
-                        deathtouch_marked.add(attacker_id)
+                damage_events.append(
+                    _DamageEvent(blocker_id, controller, blk_flags, _TARGET_CREATURE, attacker_id, power)
+                )
+                if blk_flags & _DEATHTOUCH_BIT:
+                    deathtouch_marked.add(attacker_id)
 
             # Apply damage
+            players = self.game.players
             for event in damage_events:
-                amount = int(event["amount"])
+                amount = event.amount
                 if amount <= 0:
                     continue
-                if event["target_type"] == "PLAYER":
-                    pid = event["target_id"]
-                    if pid in self.game.players:
-                        self.game.players[pid].life -= amount
-                        self.game.damage_dealt_to_players[pid] = self.game.damage_dealt_to_players.get(pid, 0) + amount
-                    if Keyword.LIFELINK in event["source_keywords"]:
-                        self.game.players[event["source_controller"]].life += amount
-                    if pid in self.game.players:
-                        self._handle_combat_damage_to_player(event["source_id"], pid)
-                        self._handle_you_lose_life(pid, amount)
-                elif event["target_type"] == "CREATURE":
-                    perm = self.game.zones.battlefield.get(event["target_id"])
+                target_id = event.target_id
+                lifelink = event.source_flags & _LIFELINK_BIT
+                if event.target_kind == _TARGET_PLAYER:
+                    ps = players.get(target_id)
+                    if ps is not None:
+                        ps.life -= amount
+                        ps.damage_taken_this_turn += amount
+                    if lifelink:
+                        players[event.source_controller].life += amount
+                    if ps is not None:
+                        self._handle_combat_damage_to_player(event.source_id, target_id)
+                        self._handle_you_lose_life(target_id, amount)
+                else:
+                    perm = battlefield.get(target_id)
                     if perm is not None:
                         perm.state.damage_marked += amount
-                    if Keyword.LIFELINK in event["source_keywords"]:
-                        self.game.players[event["source_controller"]].life += amount
+                        self._sba_damaged.add(target_id)
+                    if lifelink:
+                        players[event.source_controller].life += amount
                     if perm is not None:
                         self._handle_dealt_damage(perm.instance.instance_id, amount)
 
@@ -3015,51 +3539,89 @@ class MTGEngine:
         combat_damage_step(first_strike=False)
 
     def _apply_state_based_actions(self, deathtouch_marked: Optional[set[str]] = None) -> None:
+        """
+        Damage from effects is not checked per event; it is picked up here, once per
+        action (see submit_action) or per combat damage step.
+        """
+        if self._sba_deathtouch_pending:
+            deathtouch_marked = self._sba_deathtouch_pending | (deathtouch_marked or set())
+            self._sba_deathtouch_pending = set()
+        touched = self._sba_damaged
+        if deathtouch_marked:
+            touched = touched | deathtouch_marked
+        full_scan = self._sba_checked_version != self._derived_version
+        if not full_scan and not touched:
+            return
+        # Anything this pass changes bumps the version again, so the next call re-checks.
+        self._sba_damaged = set()
+        self._sba_checked_version = self._derived_version
+        battlefield = self.game.zones.battlefield
+        card_flags = self._card_flags
         derived = self._derived_battlefield_state()
         to_destroy: List[str] = []
+        auras: List[Permanent] = []
+        equipment: List[Permanent] = []
 
-        for perm_id, perm in self.game.zones.battlefield.items():
+        if full_scan:
+            # One sweep: lethal damage / toughness checks, and collect attachments for the checks below.
+            candidates = battlefield.items()
+        else:
+            # Nothing but damage changed since the last check, so the attachment checks
+            # below cannot fail unless something here is destroyed.
+            candidates = [(perm_id, battlefield[perm_id]) for perm_id in touched if perm_id in battlefield]
+        for perm_id, perm in candidates:
+            if full_scan:
+                flags = card_flags.get(perm.instance.card_id, 0)
+                if flags & _CARD_AURA:
+                    auras.append(perm)
+                elif flags & _CARD_EQUIPMENT:
+                    equipment.append(perm)
             d = derived.get(perm_id)
-            if d is None or d["toughness"] is None:
+            if d is None or d.toughness is None:
                 continue
-            if d["toughness"] <= 0 and Keyword.INDESTRUCTIBLE not in d["keywords"]:
-                to_destroy.append(perm_id)
+            if d.kw_mask & _INDESTRUCTIBLE_BIT:
                 continue
-            if perm.state.damage_marked >= d["toughness"]:
-                if Keyword.INDESTRUCTIBLE not in d["keywords"]:
-                    to_destroy.append(perm_id)
-                    continue
-            if deathtouch_marked and perm_id in deathtouch_marked:
-                if Keyword.INDESTRUCTIBLE not in d["keywords"]:
-                    to_destroy.append(perm_id)
+            if (
+                d.toughness <= 0
+                or perm.state.damage_marked >= d.toughness
+                or (deathtouch_marked and perm_id in deathtouch_marked)
+            ):
+                to_destroy.append(perm_id)
+        if not full_scan and len(to_destroy) > 1:
+            # Destroy in battlefield order, as a full sweep would, so dies triggers queue identically.
+            order = {perm_id: i for i, perm_id in enumerate(battlefield)}
+            to_destroy.sort(key=order.__getitem__)
 
+        # These die simultaneously, so all of them use the snapshot they were judged lethal by.
         for perm_id in to_destroy:
-            perm = self.game.zones.battlefield.get(perm_id)
+            perm = battlefield.get(perm_id)
             if perm is not None:
-                self._destroy_permanent(perm)
+                self._destroy_permanent(perm, derived)
+
+        if to_destroy:
+            # Dies triggers may have changed the battlefield; re-collect the attachments.
+            auras = [p for p in battlefield.values() if card_flags.get(p.instance.card_id, 0) & _CARD_AURA]
+            equipment = [p for p in battlefield.values() if card_flags.get(p.instance.card_id, 0) & _CARD_EQUIPMENT]
 
         # Aura attachment checks
-        for perm in list(self.game.zones.battlefield.values()):
-            card = self.game.card_db.get(perm.instance.card_id)
-            if card is None or card.aura_stats is None:
-                continue
-            if perm.state.attached_to is None:
-                self._destroy_permanent(perm)
-                continue
-            attached = self.game.zones.battlefield.get(perm.state.attached_to)
+        aura_destroyed = False
+        for perm in auras:
+            attached = battlefield.get(perm.state.attached_to) if perm.state.attached_to is not None else None
             if attached is None or not self._is_creature(attached):
                 self._destroy_permanent(perm)
+                aura_destroyed = True
+
+        if aura_destroyed:
+            equipment = [p for p in battlefield.values() if card_flags.get(p.instance.card_id, 0) & _CARD_EQUIPMENT]
 
         # Equipment detaches if illegal
-        for perm in list(self.game.zones.battlefield.values()):
-            card = self.game.card_db.get(perm.instance.card_id)
-            if card is None or card.equipment_stats is None:
-                continue
+        for perm in equipment:
             if perm.state.attached_to is None:
                 continue
-            attached = self.game.zones.battlefield.get(perm.state.attached_to)
+            attached = battlefield.get(perm.state.attached_to)
             if attached is None or not self._is_creature(attached):
                 perm.state.attached_to = None
+                self._attachments_changed()
 
     def _is_creature_lethal(self, perm: Permanent) -> bool:
         card = self.game.card_db.get(perm.instance.card_id)
@@ -3069,10 +3631,11 @@ class MTGEngine:
         return perm.state.damage_marked >= toughness
 
     def _is_creature(self, perm: Permanent) -> bool:
-        card = self.game.card_db.get(perm.instance.card_id)
-        if card is None:
-            return False
-        return CardType.CREATURE in card.card_types
+        # Card types are fixed per card_id (no effect changes them), so this is a flag test.
+        return bool(self._card_flags.get(perm.instance.card_id, 0) & _CARD_CREATURE)
+
+    def _is_artifact(self, perm: Permanent) -> bool:
+        return bool(self._card_flags.get(perm.instance.card_id, 0) & _CARD_ARTIFACT)
 
     def _normalize_target(self, targets: Any) -> Optional[Dict[str, Any]]:
         if isinstance(targets, dict):
@@ -3092,28 +3655,34 @@ class MTGEngine:
             return False
 
         derived = self._derived_battlefield_state()
+        players = self.game.players
+        battlefield = self.game.zones.battlefield
+        # Graveyard ids are collected at most once per call, and only if a CARD target needs them.
+        graveyard_ids: Optional[set[str]] = None
         for target in flat:
-            if target.get("type") == "PLAYER":
+            ttype = target.get("type")
+            if ttype == "PLAYER":
                 pid = target.get("player_id")
-                if pid not in self.game.players:
+                if pid not in players:
                     return False
                 continue
-            if target.get("type") == "PERMANENT":
-                perm = self.game.zones.battlefield.get(target.get("instance_id"))
+            if ttype == "PERMANENT":
+                perm = battlefield.get(target.get("instance_id"))
                 if perm is None:
                     return False
                 if actor_id and perm.controller_id != actor_id:
                     d = derived.get(perm.instance.instance_id)
-                    if d and Keyword.HEXPROOF in d["keywords"]:
+                    if d and d.kw_mask & _HEXPROOF_BIT:
                         return False
                 continue
-            if target.get("type") == "STACK":
-                if target.get("instance_id") not in {s.instance.instance_id for s in self.game.zones.stack if s.instance is not None}:
+            if ttype == "STACK":
+                if target.get("instance_id") not in self._stack_index:
                     return False
                 continue
-            if target.get("type") == "CARD":
-                all_grave = {ci.instance_id for ps in self.game.players.values() for ci in ps.graveyard}
-                if target.get("instance_id") not in all_grave:
+            if ttype == "CARD":
+                if graveyard_ids is None:
+                    graveyard_ids = self._graveyard_instance_ids()
+                if target.get("instance_id") not in graveyard_ids:
                     return False
                 continue
 
@@ -3126,12 +3695,8 @@ class MTGEngine:
             if spec.selector == Selector.ANY_CREATURE:
                 return self._is_creature(perm)
             if spec.selector == Selector.NON_BLACK_CREATURE:
-                if not self._is_creature(perm):
-                    continue
-                card = self.game.card_db.get(perm.instance.card_id)
-                if card is None:
-                    continue
-                if "BLACK" not in {c.value for c in card.colors}:
+                flags = self._card_flags.get(perm.instance.card_id, 0)
+                if flags & _CARD_CREATURE and not flags & _CARD_BLACK:
                     return True
         return False
 
@@ -3146,17 +3711,13 @@ class MTGEngine:
             if spec.selector == Selector.ANY_CREATURE:
                 return self._is_creature(perm)
             if spec.selector == Selector.NON_BLACK_CREATURE:
-                if not self._is_creature(perm):
-                    return False
-                card = self.game.card_db.get(perm.instance.card_id)
-                if card is None:
-                    return False
-                return "BLACK" not in {c.value for c in card.colors}
+                flags = self._card_flags.get(perm.instance.card_id, 0)
+                return bool(flags & _CARD_CREATURE) and not flags & _CARD_BLACK
 
         return False
 
     def _resolve_top_of_stack(self) -> str:
-        item = self.game.zones.stack.pop()
+        item = self._pop_stack()
         if item.kind == StackItemKind.ABILITY:
             if item.effects:
                 pending = self._resolve_effects(
@@ -3177,27 +3738,31 @@ class MTGEngine:
         card = self.game.card_db.get(item.instance.card_id)
         if card is None:
             raise RuntimeError("Card data not found for stack item")
+        return self._spell_resolvers[item.instance.card_id](item, card)
+
+    def _resolve_permanent_spell(self, item: StackItem, card: Any, attached_to: Optional[str] = None) -> str:
+        """Creature/artifact/enchantment spells enter the battlefield."""
+        perm = Permanent(instance=item.instance, controller_id=item.controller_id)
+        perm.state.attached_to = attached_to
+        self._put_onto_battlefield(perm)
+        self._handle_etb(perm)
+        self._handle_creature_enters(perm)
+        self._log(f"{item.controller_id}'s {item.instance.card_id} resolves.")
+        return item.instance.card_id
 
-        # Permanents: creature/artifact/enchantment enter battlefield
-        if CardType.CREATURE in card.card_types or CardType.ARTIFACT in card.card_types or CardType.ENCHANTMENT in card.card_types:
-            perm = Permanent(instance=item.instance, controller_id=item.controller_id)
-            if card.aura_stats is not None:
-                target = self._normalize_target(item.targets)
-                if target is None or target.get("type") != "PERMANENT":
-                    # fizzles
-                    owner_id = item.instance.owner_id
-                    if owner_id in self.game.players:
-                        self.game.players[owner_id].graveyard.append(item.instance)
-                    self._log(f"{item.controller_id}'s {item.instance.card_id} fizzles (no target).")
-                    return item.instance.card_id
-                perm.state.attached_to = target.get("instance_id")
-            self.game.zones.battlefield[item.instance.instance_id] = perm
-            self._handle_etb(perm)
-            self._handle_creature_enters(perm)
-            self._log(f"{item.controller_id}'s {item.instance.card_id} resolves.")
+    def _resolve_aura_spell(self, item: StackItem, card: Any) -> str:
+        target = self._normalize_target(item.targets)
+        if target is None or target.get("type") != "PERMANENT":
+            # fizzles
+            owner_id = item.instance.owner_id
+            if owner_id in self.game.players:
+                self.game.players[owner_id].graveyard.append(item.instance)
+            self._log(f"{item.controller_id}'s {item.instance.card_id} fizzles (no target).")
             return item.instance.card_id
+        return self._resolve_permanent_spell(item, card, attached_to=target.get("instance_id"))
 
-        # Instant/Sorcery: resolve effects then move to graveyard
+    def _resolve_effect_spell(self, item: StackItem, card: Any) -> str:
+        """Instant/Sorcery: resolve effects then move to graveyard."""
         if card.rules and card.rules.effects:
             effects = self._effects_for_card(card, item.meta)
             pending = self._resolve_effects(
@@ -3224,11 +3789,12 @@ class MTGEngine:
         return specs
 
     def _timing_allows_cast(self, card: Any, player_id: str) -> bool:
-        if Keyword.FLASH in (card.rules.keywords or set()):
+        flags = self._card_flags.get(card.id)
+        if flags is None:
+            flags = _card_flags(card)
+        if flags & (_CARD_FLASH | _CARD_INSTANT):
             return True
-        if CardType.INSTANT in card.card_types:
-            return True
-        if CardType.SORCERY in card.card_types or CardType.CREATURE in card.card_types or CardType.ARTIFACT in card.card_types or CardType.ENCHANTMENT in card.card_types:
+        if flags & _CARD_SORCERY_SPEED:
             if self.game.turn.active_player_id != player_id:
                 return False
             if self.game.turn.step not in (Step.MAIN1, Step.MAIN2):
@@ -3252,13 +3818,7 @@ class MTGEngine:
             self._ps(player_id).life -= 3
 
     def _player_controls_subtype(self, player_id: str, subtype: str) -> bool:
-        for perm in self.game.zones.battlefield.values():
-            if perm.controller_id != player_id:
-                continue
-            card = self.game.card_db.get(perm.instance.card_id)
-            if card and subtype in card.subtypes:
-                return True
-        return False
+        return self._count_subtype_on_battlefield(subtype, controller_id=player_id) > 0
 
     def _has_mana(
         self,
@@ -3268,28 +3828,27 @@ class MTGEngine:
         x_value: int = 0,
         cost_override: Optional[ManaCost] = None,
     ) -> bool:
-        colored_pool = dict(pool.colored)
-        generic_pool = int(pool.generic)
-
         cost = self._effective_mana_cost(card, player_id, x_value, cost_override)
-        for color, amount in cost.colored.items():
-            available = int(colored_pool.get(color.value, 0))
-            any_pool = int(colored_pool.get("ANY", 0))
-            if available + any_pool < amount:
+        return self._pool_covers(cost.colored, int(cost.generic), pool)
+
+    def _pool_covers(self, colored: Dict[Color, int], generic: int, pool: Any) -> bool:
+        """Whether pool covers the colored requirements (ANY fills shortfalls) plus generic; read-only."""
+        pool_colored = pool.colored
+        any_left = int(pool_colored.get("ANY", 0))
+        spent = 0
+        for color, amount in colored.items():
+            available = int(pool_colored.get(color.value, 0))
+            if available + any_left < amount:
                 return False
-            use = min(available, amount)
-            colored_pool[color.value] = available - use
-            remaining = amount - use
-            if remaining > 0:
-                colored_pool["ANY"] = any_pool - remaining
+            if available < amount:
+                any_left -= amount - available
+            spent += amount
 
-        remaining_generic = int(cost.generic)
-        if generic_pool >= remaining_generic:
+        generic_pool = int(pool.generic)
+        if generic_pool >= generic:
             return True
-
-        remaining_generic -= generic_pool
-        remaining_colored = sum(int(v) for v in colored_pool.values())
-        return remaining_colored >= remaining_generic
+        remaining_colored = sum(pool_colored.values()) - spent
+        return remaining_colored >= generic - generic_pool
 
     def _pay_mana(
         self,
@@ -3300,42 +3859,21 @@ class MTGEngine:
         cost_override: Optional[ManaCost] = None,
     ) -> None:
         cost = self._effective_mana_cost(card, player_id, x_value, cost_override)
-        for color, amount in cost.colored.items():
-            available = pool.colored.get(color.value, 0)
+        self._spend_mana(cost.colored, int(cost.generic), pool)
+
+    def _spend_mana(self, colored: Dict[Color, int], generic: int, pool: Any) -> None:
+        """Pay colored requirements (falling back to ANY), then generic; see _pool_covers."""
+        pool_colored = pool.colored
+        for color, amount in colored.items():
+            key = color.value
+            available = pool_colored.get(key, 0)
             use = min(available, int(amount))
-            pool.colored[color.value] = available - use
+            _set_pool_count(pool_colored, key, available - use)
             remaining = int(amount) - use
-            if pool.colored[color.value] <= 0:
-                pool.colored.pop(color.value, None)
             if remaining > 0:
-                any_pool = pool.colored.get("ANY", 0)
-                spend = min(any_pool, remaining)
-                pool.colored["ANY"] = any_pool - spend
-                if pool.colored["ANY"] <= 0:
-                    pool.colored.pop("ANY", None)
-
-        remaining_generic = int(cost.generic)
-        if remaining_generic <= 0:
-            return
-
-        use_generic = min(pool.generic, remaining_generic)
-        pool.generic -= use_generic
-        remaining_generic -= use_generic
-
-        if remaining_generic <= 0:
-            return
-
-        for color in sorted(list(pool.colored.keys())):
-            if remaining_generic <= 0:
-                break
-            available = pool.colored.get(color, 0)
-            if available <= 0:
-                continue
-            spend = min(available, remaining_generic)
-            pool.colored[color] = available - spend
-            if pool.colored[color] <= 0:
-                pool.colored.pop(color, None)
-            remaining_generic -= spend
+                any_pool = pool_colored.get("ANY", 0)
+                _set_pool_count(pool_colored, "ANY", any_pool - min(any_pool, remaining))
+        self._pay_generic_cost(pool, generic)
 
     def _effective_mana_cost(
         self,
@@ -3350,23 +3888,25 @@ class MTGEngine:
         return ManaCost(generic=generic, colored=cost.colored, x=cost.x)
 
     def _cost_reduction_for_spell(self, card: Any, player_id: str) -> int:
+        # Reductions only depend on what the player controls, so they live as long as the
+        # derived-state version (bumped on every battlefield change).
+        if self._cost_reduction_version != self._derived_version:
+            self._cost_reduction_cache.clear()
+            self._cost_reduction_version = self._derived_version
+        key = (player_id, card.id)
+        cached = self._cost_reduction_cache.get(key)
+        if cached is None:
+            cached = self._cost_reduction_cache[key] = self._compute_cost_reduction(card, player_id)
+        return cached
+
+    def _compute_cost_reduction(self, card: Any, player_id: str) -> int:
         reduction = 0
-        for perm in self.game.zones.battlefield.values():
-            if perm.controller_id != player_id:
-                continue
-            source_card = self.game.card_db.get(perm.instance.card_id)
-            if source_card is None:
-                continue
-            for sa in source_card.rules.static_abilities:
-                for eff in sa.effects:
-                    if eff.type != EffectType.COST_REDUCTION:
-                        continue
-                    tags = eff.params.get("spell_tags") or []
-                    if self._spell_matches_tags(card, tags):
-                        reduction += int(eff.params.get("amount", 0) or 0)
-                    subtype = eff.params.get("spell_subtype")
-                    if subtype and subtype in card.subtypes:
-                        reduction += int(eff.params.get("amount", 0) or 0)
+        for reductions in self._cost_reducers.get(player_id, {}).values():
+            for tags, subtype, amount in reductions:
+                if self._spell_matches_tags(card, tags):
+                    reduction += amount
+                if subtype and subtype in card.subtypes:
+                    reduction += amount
         return reduction
 
     def _spell_matches_tags(self, card: Any, tags: List[str]) -> bool:
@@ -3390,31 +3930,10 @@ class MTGEngine:
     ) -> bool:
         if cost is None:
             return True
-        colored_pool = dict(pool.colored)
-        generic_pool = int(pool.generic)
-
         reduction = 0
         if card is not None and player_id is not None:
             reduction = self._cost_reduction_for_spell(card, player_id)
-        remaining_generic = max(0, int(cost.generic) - reduction)
-
-        for color, amount in cost.colored.items():
-            available = int(colored_pool.get(color.value, 0))
-            any_pool = int(colored_pool.get("ANY", 0))
-            if available + any_pool < amount:
-                return False
-            use = min(available, amount)
-            colored_pool[color.value] = available - use
-            remaining = amount - use
-            if remaining > 0:
-                colored_pool["ANY"] = any_pool - remaining
-
-        if generic_pool >= remaining_generic:
-            return True
-
-        remaining_generic -= generic_pool
-        remaining_colored = sum(int(v) for v in colored_pool.values())
-        return remaining_colored >= remaining_generic
+        return self._pool_covers(cost.colored, max(0, int(cost.generic) - reduction), pool)
 
     def _pay_mana_cost(
         self,
@@ -3428,42 +3947,7 @@ class MTGEngine:
         reduction = 0
         if card is not None and player_id is not None:
             reduction = self._cost_reduction_for_spell(card, player_id)
-        remaining_generic = max(0, int(cost.generic) - reduction)
-        for color, amount in cost.colored.items():
-            available = pool.colored.get(color.value, 0)
-            use = min(available, int(amount))
-            pool.colored[color.value] = available - use
-            remaining = int(amount) - use
-            if pool.colored[color.value] <= 0:
-                pool.colored.pop(color.value, None)
-            if remaining > 0:
-                any_pool = pool.colored.get("ANY", 0)
-                spend = min(any_pool, remaining)
-                pool.colored["ANY"] = any_pool - spend
-                if pool.colored["ANY"] <= 0:
-                    pool.colored.pop("ANY", None)
-
-        if remaining_generic <= 0:
-            return
-
-        use_generic = min(pool.generic, remaining_generic)
-        pool.generic -= use_generic
-        remaining_generic -= use_generic
-
-        if remaining_generic <= 0:
-            return
-
-        for color in sorted(list(pool.colored.keys())):
-            if remaining_generic <= 0:
-                break
-            available = pool.colored.get(color, 0)
-            if available <= 0:
-                continue
-            spend = min(available, remaining_generic)
-            pool.colored[color] = available - spend
-            if pool.colored[color] <= 0:
-                pool.colored.pop(color, None)
-            remaining_generic -= spend
+        self._spend_mana(cost.colored, max(0, int(cost.generic) - reduction), pool)
 
     def _discard_from_hand(self, player_id: str, instance_id: str) -> None:
         ps = self._ps(player_id)
@@ -3476,13 +3960,7 @@ class MTGEngine:
 
     def _sacrifice_permanent(self, perm: Permanent) -> None:
         self._handle_dies(perm)
-        self._return_exiled_for_source(perm.instance.instance_id)
-        self.game.zones.battlefield.pop(perm.instance.instance_id, None)
-        if perm.instance.is_token:
-            return
-        owner = perm.instance.owner_id
-        if owner in self.game.players:
-            self.game.players[owner].graveyard.append(perm.instance)
+        self._move_permanent(perm, "GRAVEYARD")
 
     def _is_mana_ability(self, ability: Any) -> bool:
         if any(getattr(eff, "params", {}).get("target") is not None for eff in ability.effects):
@@ -3497,41 +3975,51 @@ class MTGEngine:
         return True
 
     def _targets_exist(self, targets: Any) -> bool:
-        flat = self._flatten_targets(targets)
         if targets is None:
             return True
-        for t in flat:
+        players = self.game.players
+        battlefield = self.game.zones.battlefield
+        graveyard_ids: Optional[set[str]] = None
+        for t in self._flatten_targets(targets):
             ttype = t.get("type")
             if ttype == "PLAYER":
-                if t.get("player_id") not in self.game.players:
+                if t.get("player_id") not in players:
                     return False
             elif ttype == "PERMANENT":
-                if t.get("instance_id") not in self.game.zones.battlefield:
+                if t.get("instance_id") not in battlefield:
                     return False
             elif ttype == "STACK":
-                if t.get("instance_id") not in {s.instance.instance_id for s in self.game.zones.stack if s.instance is not None}:
+                if t.get("instance_id") not in self._stack_index:
                     return False
             elif ttype == "CARD":
-                if t.get("instance_id") not in {ci.instance_id for ps in self.game.players.values() for ci in ps.graveyard}:
+                if graveyard_ids is None:
+                    graveyard_ids = self._graveyard_instance_ids()
+                if t.get("instance_id") not in graveyard_ids:
                     return False
         return True
 
-    def _flatten_targets(self, targets: Any) -> List[Dict[str, Any]]:
-        if targets is None:
-            return []
+    def _graveyard_instance_ids(self) -> set[str]:
+        return {ci.instance_id for ps in self.game.players.values() for ci in ps.graveyard}
+
+    def _flatten_targets(self, targets: Any) -> Sequence[Dict[str, Any]]:
+        """
+        Flatten a target dict, a list of target dicts, or a list of target groups.
+        A flat list is returned as-is, so callers must treat the result as read-only.
+        """
         if isinstance(targets, dict):
-            return [targets]
-        if isinstance(targets, list):
-            if not targets:
+            return (targets,)
+        if not targets or not isinstance(targets, list):
+            return []
+        first = targets[0]
+        if isinstance(first, dict):
+            return targets if all(isinstance(t, dict) for t in targets) else []
+        if isinstance(first, list):
+            if not all(isinstance(g, list) for g in targets):
                 return []
-            if all(isinstance(t, dict) for t in targets):
-                return list(targets)
-            if all(isinstance(t, list) for t in targets):
-                flat: List[Dict[str, Any]] = []
-                for group in targets:
-                    if isinstance(group, list):
-                        flat.extend([t for t in group if isinstance(t, dict)])
-                return flat
+            flat: List[Dict[str, Any]] = []
+            for group in targets:
+                flat.extend([t for t in group if isinstance(t, dict)])
+            return flat
         return []
 
     def _notify_becomes_target(self, targets: Any, source_controller_id: str) -> None:
@@ -3545,64 +4033,80 @@ class MTGEngine:
                 self._handle_becomes_target(perm.instance.instance_id, source_controller_id)
 
     def _attachments_by_host(self) -> Dict[str, List[str]]:
-        mapping: Dict[str, List[str]] = {}
-        for perm in self.game.zones.battlefield.values():
-            attached_to = perm.state.attached_to
-            if attached_to:
-                mapping.setdefault(attached_to, []).append(perm.instance.instance_id)
-        return mapping
-
-    def _derived_battlefield_state(self) -> Dict[str, Dict[str, Any]]:
-        derived: Dict[str, Dict[str, Any]] = {}
+        """
+        Host instance_id -> attached instance_ids, in battlefield order. Rebuilt only after
+        _attachments_changed, not on every derived-state change. Read-only; hosts with nothing
+        attached are absent.
+        """
+        if self._attachments_version != self._attachments_generation:
+            mapping: Dict[str, List[str]] = defaultdict(list)
+            for perm in self.game.zones.battlefield.values():
+                attached_to = perm.state.attached_to
+                if attached_to:
+                    mapping[attached_to].append(perm.instance.instance_id)
+            # A plain dict, so a lookup cannot add empty entries to the shared cache.
+            self._attachments_cache = dict(mapping)
+            self._attachments_version = self._attachments_generation
+        return self._attachments_cache
+
+    def _invalidate_derived(self) -> None:
+        self._derived_version += 1
+
+    def _attachments_changed(self) -> None:
+        """Call after any attached_to change or battlefield entry/exit; derived state reads attachments too."""
+        self._attachments_generation += 1
+        self._invalidate_derived()
+
+    def _derived_battlefield_state(self) -> Dict[str, _DerivedPerm]:
+        """
+        Return the derived battlefield snapshot, recomputing only when the battlefield,
+        counters, attachments, goad, temporary effects, or turn position changed.
+        Callers must treat the result as read-only.
+        """
+        if self._derived_cache_version != self._derived_version:
+            self._derived_cache = self._compute_derived_battlefield_state()
+            self._derived_cache_version = self._derived_version
+        return self._derived_cache
+
+    def _compute_derived_battlefield_state(self) -> Dict[str, _DerivedPerm]:
+        derived: Dict[str, _DerivedPerm] = {}
         attachments_by_host = self._attachments_by_host()
 
+        card_base_pt = self._card_base_pt
+        card_keywords = self._card_keywords
+        card_subtypes = self._card_subtypes
         for perm in self.game.zones.battlefield.values():
-            card = self.game.card_db.get(perm.instance.card_id)
-            if card is None:
+            card_id = perm.instance.card_id
+            base_pt = card_base_pt.get(card_id)
+            if base_pt is None:
                 continue
-            base_power = None
-            base_toughness = None
-            if card.creature_stats is not None:
-                base_power = card.creature_stats.base_power
-                base_toughness = card.creature_stats.base_toughness
-
-            plus = perm.state.counters.get("+1/+1", 0)
-            minus = perm.state.counters.get("-1/-1", 0)
-            counter_mod = plus - minus
-
-            derived[perm.instance.instance_id] = {
-                "base_power": base_power,
-                "base_toughness": base_toughness,
-                "base_override": None,
-                "pt_mod": [0, 0],
-                "counter_mod": counter_mod,
-                "power": base_power,
-                "toughness": base_toughness,
-                "keywords": set(card.rules.keywords),
-                "subtypes": set(card.subtypes),
-                "cant_attack_players": set(),
-                "must_attack": False,
-                "must_be_blocked_by_all": False,
-                "prevent_combat_damage": False,
-                "assign_damage_as_unblocked": False,
-                "goaded_by": None,
-                "controller_id": perm.controller_id,
-            }
+            base_power, base_toughness = base_pt
+
+            counters = perm.state.counters
+            counter_mod = counters.get(_PLUS_ONE_COUNTER, 0) - counters.get(_MINUS_ONE_COUNTER, 0)
+
+            derived[perm.instance.instance_id] = _DerivedPerm(
+                base_power=base_power,
+                base_toughness=base_toughness,
+                counter_mod=counter_mod,
+                power=base_power,
+                toughness=base_toughness,
+                # Shared per-card frozensets; continuous effects copy them on first write.
+                keywords=card_keywords[card_id],
+                subtypes=card_subtypes[card_id],
+                controller_id=perm.controller_id,
+            )
 
-        # Apply static abilities
-        for source_perm in self.game.zones.battlefield.values():
-            card = self.game.card_db.get(source_perm.instance.card_id)
-            if card is None:
-                continue
-            for sa in card.rules.static_abilities:
-                for eff in sa.effects:
-                    self._apply_continuous_effect(
-                        eff,
-                        source_perm,
-                        derived,
-                        attachments_by_host,
-                        controller_id=source_perm.controller_id,
-                    )
+        # Apply static abilities; only permanents that have any are visited, in battlefield order.
+        for source_perm in self._bf_static_sources.values():
+            for eff in self._card_static_effects[source_perm.instance.card_id]:
+                self._apply_continuous_effect(
+                    eff,
+                    source_perm,
+                    derived,
+                    attachments_by_host,
+                    controller_id=source_perm.controller_id,
+                )
 
         # Apply temporary effects
         for temp in self.game.temporary_effects:
@@ -3619,27 +4123,38 @@ class MTGEngine:
                 controller_id=temp.controller_id,
             )
 
-        # Apply goad from permanent state
+        # Apply goad from permanent state, then finalize keyword masks and power/toughness
+        turn_number = self.game.turn.turn_number
+        card_keywords = self._card_keywords
+        card_keyword_masks = self._card_keyword_masks
         for perm in self.game.zones.battlefield.values():
-            if perm.instance.instance_id not in derived:
+            d = derived.get(perm.instance.instance_id)
+            if d is None:
                 continue
-            if perm.state.goaded_by and perm.state.goaded_until_turn is not None:
-                if self.game.turn.turn_number <= perm.state.goaded_until_turn:
-                    derived[perm.instance.instance_id]["goaded_by"] = perm.state.goaded_by
-                    derived[perm.instance.instance_id]["must_attack"] = True
-
-        # Finalize power/toughness
-        for pid, d in derived.items():
-            if d["base_power"] is None or d["base_toughness"] is None:
-                d["power"] = None
-                d["toughness"] = None
+            state = perm.state
+            if state.goaded_by and state.goaded_until_turn is not None:
+                if turn_number <= state.goaded_until_turn:
+                    d.goaded_by = state.goaded_by
+                    d.must_attack = True
+            card_id = perm.instance.card_id
+            keywords = d.keywords
+            # Untouched keyword sets are still the shared per-card frozenset, whose mask is precomputed.
+            if keywords is card_keywords[card_id]:
+                d.kw_mask = card_keyword_masks[card_id]
+            else:
+                d.kw_mask = _keyword_mask(keywords)
+            if d.base_power is None or d.base_toughness is None:
+                d.power = None
+                d.toughness = None
                 continue
-            base_power = d["base_override"][0] if d["base_override"] else d["base_power"]
-            base_toughness = d["base_override"][1] if d["base_override"] else d["base_toughness"]
-            p = int(base_power) + int(d["counter_mod"]) + int(d["pt_mod"][0])
-            t = int(base_toughness) + int(d["counter_mod"]) + int(d["pt_mod"][1])
-            d["power"] = p
-            d["toughness"] = t
+            override = d.base_override
+            mod = d.counter_mod
+            if override:
+                d.power = int(override[0]) + mod + d.pt_mod_power
+                d.toughness = int(override[1]) + mod + d.pt_mod_toughness
+            else:
+                d.power = int(d.base_power) + mod + d.pt_mod_power
+                d.toughness = int(d.base_toughness) + mod + d.pt_mod_toughness
 
         return derived
 
@@ -3650,74 +4165,26 @@ class MTGEngine:
             return True
         if temp.expires_step is None:
             return True
-        order = {
-            Step.UNTAP: 0,
-            Step.DRAW: 1,
-            Step.MAIN1: 2,
-            Step.DECLARE_ATTACKERS: 3,
-            Step.DECLARE_BLOCKERS: 4,
-            Step.DAMAGE: 5,
-            Step.MAIN2: 6,
-            Step.END: 7,
-        }
-        return order.get(self.game.turn.step, 0) <= order.get(temp.expires_step, 0)
+        return _STEP_ORDER.get(self.game.turn.step, 0) <= _STEP_ORDER.get(temp.expires_step, 0)
 
     def _apply_continuous_effect(
         self,
         eff: Any,
         source_perm: Optional[Permanent],
-        derived: Dict[str, Dict[str, Any]],
+        derived: Dict[str, _DerivedPerm],
         attachments_by_host: Dict[str, List[str]],
         controller_id: Optional[str],
     ) -> None:
         if not derived:
             return
 
-        if eff.type == EffectType.COST_REDUCTION:
+        handler = self._untargeted_continuous_handlers.get(eff.type)
+        if handler is not None:
+            handler(eff, source_perm, derived, attachments_by_host, controller_id)
             return
 
-        if eff.type == EffectType.OTHER_CONTROLLED_BUFF_PER_ATTACHMENT:
-            if source_perm is None:
-                return
-            amount = eff.params.get("amount_per_attachment", {})
-            for pid, d in derived.items():
-                if d["controller_id"] != source_perm.controller_id:
-                    continue
-                if pid == source_perm.instance.instance_id:
-                    continue
-                count = len(attachments_by_host.get(pid, []))
-                d["pt_mod"][0] += int(amount.get("power", 0)) * count
-                d["pt_mod"][1] += int(amount.get("toughness", 0)) * count
-            return
-
-        if eff.type in (EffectType.CONTROLLED_TYPE_LORD, EffectType.OTHER_CONTROLLED_TYPE_LORD):
-            if source_perm is None:
-                return
-            subtype = eff.params.get("subtype")
-            amount = eff.params.get("amount", {})
-            keywords = eff.params.get("keywords") or []
-            for pid, d in derived.items():
-                if d["controller_id"] != source_perm.controller_id:
-                    continue
-                if subtype and subtype not in d["subtypes"]:
-                    continue
-                if eff.type == EffectType.OTHER_CONTROLLED_TYPE_LORD and pid == source_perm.instance.instance_id:
-                    continue
-                d["pt_mod"][0] += int(amount.get("power", 0))
-                d["pt_mod"][1] += int(amount.get("toughness", 0))
-                for kw in keywords:
-                    try:
-                        d["keywords"].add(Keyword[kw])
-                    except Exception:
-                        continue
-            return
-
-        if eff.type == EffectType.EQUIPPED_ONLY:
-            if source_perm is None or not source_perm.state.attached_to:
-                return
-            target_id = source_perm.state.attached_to
-            for inner in eff.params.get("effects", []):
-                self._apply_effect_to_target(inner, target_id, source_perm, derived, controller_id)
+        handler = self._targeted_continuous_handlers.get(eff.type)
+        if handler is None:
             return
 
         targets = self._continuous_targets(eff, source_perm, derived)
@@ -3727,161 +4194,291 @@ class MTGEngine:
         if not self._condition_met(eff.params.get("condition"), source_perm, controller_id, derived):
             return
 
-        if eff.type == EffectType.SET_BASE_P_T:
-            power = int(eff.params.get("power", 0))
-            toughness = int(eff.params.get("toughness", 0))
-            for tid in targets:
-                derived[tid]["base_override"] = (power, toughness)
-            return
+        handler(eff, targets, source_perm, derived, controller_id)
 
-        if eff.type == EffectType.MODIFY_P_T:
-            amount = eff.params.get("amount", {})
-            for tid in targets:
-                derived[tid]["pt_mod"][0] += int(amount.get("power", 0))
-                derived[tid]["pt_mod"][1] += int(amount.get("toughness", 0))
+    def _apply_effect_to_target(
+        self,
+        eff: Any,
+        target_id: str,
+        source_perm: Optional[Permanent],
+        derived: Dict[str, _DerivedPerm],
+        controller_id: Optional[str],
+    ) -> None:
+        if target_id not in derived:
             return
-
-        if eff.type == EffectType.ADD_KEYWORD:
-            kw = eff.params.get("keyword")
-            if isinstance(kw, str):
-                try:
-                    kw_enum = Keyword[kw]
-                except Exception:
-                    kw_enum = None
-            else:
-                kw_enum = kw
-            for tid in targets:
-                if kw_enum is not None:
-                    derived[tid]["keywords"].add(kw_enum)
+        handler = self._attached_continuous_handlers.get(eff.type)
+        if handler is not None:
+            handler(eff, (target_id,), source_perm, derived, controller_id)
+
+    def _derived_for_controller(
+        self, derived: Dict[str, _DerivedPerm], controller_id: str
+    ) -> Iterator[Tuple[str, _DerivedPerm]]:
+        """(instance_id, entry) pairs for one controller's permanents, via the controller index."""
+        for pid in self._bf_by_controller.get(controller_id, ()):
+            d = derived.get(pid)
+            if d is not None:
+                yield pid, d
+
+    def _pt_amount(self, eff: Any, key: str = "amount") -> Tuple[int, int]:
+        """(power, toughness) of an effect's P/T amount param, converted once per static card effect."""
+        cached = self._effect_pt_amounts.get(id(eff))
+        if cached is not None:
+            return cached
+        amount = eff.params.get(key, {})
+        pt = (int(amount.get("power", 0)), int(amount.get("toughness", 0)))
+        if id(eff) in self._static_effect_ids:
+            self._effect_pt_amounts[id(eff)] = pt
+        return pt
+
+    def _effect_keyword_list(self, eff: Any) -> List[Keyword]:
+        """An effect's keywords param as Keywords, resolved once per static card effect."""
+        cached = self._effect_keywords.get(id(eff))
+        if cached is not None:
+            return cached
+        keywords = _keyword_params(eff.params.get("keywords") or ())
+        if id(eff) in self._static_effect_ids:
+            self._effect_keywords[id(eff)] = keywords
+        return keywords
+
+    # Continuous effects that pick their own permanents:
+    # (eff, source_perm, derived, attachments_by_host, controller_id) -> None.
+
+    def _continuous_buff_per_attachment(
+        self,
+        eff: Any,
+        source_perm: Optional[Permanent],
+        derived: Dict[str, _DerivedPerm],
+        attachments_by_host: Dict[str, List[str]],
+        controller_id: Optional[str],
+    ) -> None:
+        if source_perm is None:
             return
+        power, toughness = self._pt_amount(eff, "amount_per_attachment")
+        for pid, d in self._derived_for_controller(derived, source_perm.controller_id):
+            if pid == source_perm.instance.instance_id:
+                continue
+            count = len(attachments_by_host.get(pid, []))
+            d.pt_mod_power += power * count
+            d.pt_mod_toughness += toughness * count
 
-        if eff.type == EffectType.REMOVE_KEYWORD:
-            kw = eff.params.get("keyword")
-            if isinstance(kw, str):
-                try:
-                    kw_enum = Keyword[kw]
-                except Exception:
-                    kw_enum = None
-            else:
-                kw_enum = kw
-            for tid in targets:
-                if kw_enum is not None and kw_enum in derived[tid]["keywords"]:
-                    derived[tid]["keywords"].remove(kw_enum)
+    def _continuous_type_lord(
+        self,
+        eff: Any,
+        source_perm: Optional[Permanent],
+        derived: Dict[str, _DerivedPerm],
+        attachments_by_host: Dict[str, List[str]],
+        controller_id: Optional[str],
+    ) -> None:
+        if source_perm is None:
             return
+        subtype = eff.params.get("subtype")
+        power, toughness = self._pt_amount(eff)
+        keywords = self._effect_keyword_list(eff)
+        for pid, d in self._derived_for_controller(derived, source_perm.controller_id):
+            if subtype and subtype not in d.subtypes:
+                continue
+            if eff.type == EffectType.OTHER_CONTROLLED_TYPE_LORD and pid == source_perm.instance.instance_id:
+                continue
+            d.pt_mod_power += power
+            d.pt_mod_toughness += toughness
+            for kw in keywords:
+                _grant_keyword(d, kw)
 
-        if eff.type == EffectType.ADD_SUBTYPE:
-            subtype = eff.params.get("subtype")
-            if subtype:
-                for tid in targets:
-                    derived[tid]["subtypes"].add(subtype)
+    def _continuous_equipped_only(
+        self,
+        eff: Any,
+        source_perm: Optional[Permanent],
+        derived: Dict[str, _DerivedPerm],
+        attachments_by_host: Dict[str, List[str]],
+        controller_id: Optional[str],
+    ) -> None:
+        if source_perm is None or not source_perm.state.attached_to:
             return
+        target_id = source_perm.state.attached_to
+        for inner in eff.params.get("effects", []):
+            self._apply_effect_to_target(inner, target_id, source_perm, derived, controller_id)
 
-        if eff.type == EffectType.CANT_ATTACK_PLAYER:
-            if controller_id is None:
-                return
-            for tid in targets:
-                derived[tid]["cant_attack_players"].add(controller_id)
-            return
+    # Continuous effects applied to _continuous_targets once the effect's condition holds:
+    # (eff, targets, source_perm, derived, controller_id) -> None.
 
-        if eff.type == EffectType.REQUIRE_ATTACK:
-            controller = eff.params.get("controller")
-            if controller == "OPPONENTS" and source_perm is not None:
-                for pid, d in derived.items():
-                    if d["controller_id"] != source_perm.controller_id:
-                        d["must_attack"] = True
-            return
+    def _continuous_set_base_pt(
+        self,
+        eff: Any,
+        targets: Sequence[str],
+        source_perm: Optional[Permanent],
+        derived: Dict[str, _DerivedPerm],
+        controller_id: Optional[str],
+    ) -> None:
+        power = int(eff.params.get("power", 0))
+        toughness = int(eff.params.get("toughness", 0))
+        for tid in targets:
+            derived[tid].base_override = (power, toughness)
+
+    def _continuous_modify_pt(
+        self,
+        eff: Any,
+        targets: Sequence[str],
+        source_perm: Optional[Permanent],
+        derived: Dict[str, _DerivedPerm],
+        controller_id: Optional[str],
+    ) -> None:
+        power, toughness = self._pt_amount(eff)
+        for tid in targets:
+            d = derived[tid]
+            d.pt_mod_power += power
+            d.pt_mod_toughness += toughness
 
-        if eff.type == EffectType.REQUIRE_BLOCK:
-            for tid in targets:
-                derived[tid]["must_be_blocked_by_all"] = True
+    def _continuous_add_keyword(
+        self,
+        eff: Any,
+        targets: Sequence[str],
+        source_perm: Optional[Permanent],
+        derived: Dict[str, _DerivedPerm],
+        controller_id: Optional[str],
+    ) -> None:
+        kw_enum = _keyword_param(eff.params.get("keyword"))
+        if kw_enum is None:
             return
+        for tid in targets:
+            _grant_keyword(derived[tid], kw_enum)
 
-        if eff.type == EffectType.PREVENT_COMBAT_DAMAGE:
-            for tid in targets:
-                derived[tid]["prevent_combat_damage"] = True
+    def _continuous_remove_keyword(
+        self,
+        eff: Any,
+        targets: Sequence[str],
+        source_perm: Optional[Permanent],
+        derived: Dict[str, _DerivedPerm],
+        controller_id: Optional[str],
+    ) -> None:
+        kw_enum = _keyword_param(eff.params.get("keyword"))
+        if kw_enum is None:
             return
+        for tid in targets:
+            _remove_keyword(derived[tid], kw_enum)
 
-        if eff.type == EffectType.ASSIGN_DAMAGE_AS_UNBLOCKED:
-            for tid in targets:
-                derived[tid]["assign_damage_as_unblocked"] = True
+    def _continuous_add_subtype(
+        self,
+        eff: Any,
+        targets: Sequence[str],
+        source_perm: Optional[Permanent],
+        derived: Dict[str, _DerivedPerm],
+        controller_id: Optional[str],
+    ) -> None:
+        subtype = eff.params.get("subtype")
+        if not subtype:
             return
+        for tid in targets:
+            subtypes = derived[tid].subtypes
+            if subtype in subtypes:
+                continue
+            if type(subtypes) is frozenset:
+                subtypes = derived[tid].subtypes = set(subtypes)
+            subtypes.add(subtype)
 
-        if eff.type == EffectType.GOAD:
-            if controller_id is None:
-                return
-            for tid in targets:
-                derived[tid]["goaded_by"] = controller_id
-                derived[tid]["must_attack"] = True
+    def _continuous_cant_attack_player(
+        self,
+        eff: Any,
+        targets: Sequence[str],
+        source_perm: Optional[Permanent],
+        derived: Dict[str, _DerivedPerm],
+        controller_id: Optional[str],
+    ) -> None:
+        if controller_id is None:
             return
+        for tid in targets:
+            derived[tid].cant_attack_players.add(controller_id)
 
-        if eff.type == EffectType.TEAM_BUFF:
-            if controller_id is None:
-                return
-            subtype = eff.params.get("subtype")
-            amount = eff.params.get("amount", {})
-            keywords = eff.params.get("keywords") or []
-            for pid, d in derived.items():
-                if d["controller_id"] != controller_id:
-                    continue
-                if subtype and subtype not in d["subtypes"]:
+    def _continuous_require_attack(
+        self,
+        eff: Any,
+        targets: Sequence[str],
+        source_perm: Optional[Permanent],
+        derived: Dict[str, _DerivedPerm],
+        controller_id: Optional[str],
+    ) -> None:
+        if eff.params.get("controller") == "OPPONENTS" and source_perm is not None:
+            for player_id in self._bf_by_controller:
+                if player_id == source_perm.controller_id:
                     continue
-                if eff.params.get("exclude_source") and source_perm is not None:
-                    if pid == source_perm.instance.instance_id:
-                        continue
-                d["pt_mod"][0] += int(amount.get("power", 0))
-                d["pt_mod"][1] += int(amount.get("toughness", 0))
-                for kw in keywords:
-                    try:
-                        d["keywords"].add(Keyword[kw])
-                    except Exception:
-                        continue
-            return
+                for _, d in self._derived_for_controller(derived, player_id):
+                    d.must_attack = True
 
-    def _apply_effect_to_target(
+    def _continuous_require_block(
         self,
         eff: Any,
-        target_id: str,
+        targets: Sequence[str],
         source_perm: Optional[Permanent],
-        derived: Dict[str, Dict[str, Any]],
+        derived: Dict[str, _DerivedPerm],
         controller_id: Optional[str],
     ) -> None:
-        if target_id not in derived:
-            return
-        if eff.type == EffectType.MODIFY_P_T:
-            amount = eff.params.get("amount", {})
-            derived[target_id]["pt_mod"][0] += int(amount.get("power", 0))
-            derived[target_id]["pt_mod"][1] += int(amount.get("toughness", 0))
-            return
-        if eff.type == EffectType.ADD_KEYWORD:
-            kw = eff.params.get("keyword")
-            if isinstance(kw, str):
-                try:
-                    kw_enum = Keyword[kw]
-                except Exception:
-                    kw_enum = None
-            else:
-                kw_enum = kw
-            if kw_enum is not None:
-                derived[target_id]["keywords"].add(kw_enum)
+        for tid in targets:
+            derived[tid].must_be_blocked_by_all = True
+
+    def _continuous_prevent_combat_damage(
+        self,
+        eff: Any,
+        targets: Sequence[str],
+        source_perm: Optional[Permanent],
+        derived: Dict[str, _DerivedPerm],
+        controller_id: Optional[str],
+    ) -> None:
+        for tid in targets:
+            derived[tid].prevent_combat_damage = True
+
+    def _continuous_assign_damage_as_unblocked(
+        self,
+        eff: Any,
+        targets: Sequence[str],
+        source_perm: Optional[Permanent],
+        derived: Dict[str, _DerivedPerm],
+        controller_id: Optional[str],
+    ) -> None:
+        for tid in targets:
+            derived[tid].assign_damage_as_unblocked = True
+
+    def _continuous_goad(
+        self,
+        eff: Any,
+        targets: Sequence[str],
+        source_perm: Optional[Permanent],
+        derived: Dict[str, _DerivedPerm],
+        controller_id: Optional[str],
+    ) -> None:
+        if controller_id is None:
             return
-        if eff.type == EffectType.REMOVE_KEYWORD:
-            kw = eff.params.get("keyword")
-            if isinstance(kw, str):
-                try:
-                    kw_enum = Keyword[kw]
-                except Exception:
-                    kw_enum = None
-            else:
-                kw_enum = kw
-            if kw_enum is not None and kw_enum in derived[target_id]["keywords"]:
-                derived[target_id]["keywords"].remove(kw_enum)
+        for tid in targets:
+            derived[tid].goaded_by = controller_id
+            derived[tid].must_attack = True
+
+    def _continuous_team_buff(
+        self,
+        eff: Any,
+        targets: Sequence[str],
+        source_perm: Optional[Permanent],
+        derived: Dict[str, _DerivedPerm],
+        controller_id: Optional[str],
+    ) -> None:
+        if controller_id is None:
             return
+        subtype = eff.params.get("subtype")
+        power, toughness = self._pt_amount(eff)
+        keywords = self._effect_keyword_list(eff)
+        for pid, d in self._derived_for_controller(derived, controller_id):
+            if subtype and subtype not in d.subtypes:
+                continue
+            if eff.params.get("exclude_source") and source_perm is not None:
+                if pid == source_perm.instance.instance_id:
+                    continue
+            d.pt_mod_power += power
+            d.pt_mod_toughness += toughness
+            for kw in keywords:
+                _grant_keyword(d, kw)
 
     def _continuous_targets(
         self,
         eff: Any,
         source_perm: Optional[Permanent],
-        derived: Dict[str, Dict[str, Any]],
+        derived: Dict[str, _DerivedPerm],
     ) -> List[str]:
         target = eff.params.get("target")
         if isinstance(target, dict) and target.get("type") == "PERMANENT":
@@ -3890,22 +4487,40 @@ class MTGEngine:
         if target == "SELF" and source_perm is not None:
             return [source_perm.instance.instance_id]
         if isinstance(target, TargetSpec):
-            if target.selector == Selector.TARGET_EQUIPPED_CREATURE and source_perm is not None:
-                if source_perm.state.attached_to:
-                    return [source_perm.state.attached_to]
-                return []
-            if target.selector == Selector.TARGET_ENCHANTED_CREATURE and source_perm is not None:
-                if source_perm.state.attached_to:
-                    return [source_perm.state.attached_to]
+            if (
+                target.selector == Selector.TARGET_EQUIPPED_CREATURE
+                or target.selector == Selector.TARGET_ENCHANTED_CREATURE
+            ) and source_perm is not None:
+                # The host may have left the battlefield before SBAs detach or destroy the attachment.
+                host_id = source_perm.state.attached_to
+                return [host_id] if host_id and host_id in derived else []
+            if target.zone != Zone.BATTLEFIELD:
                 return []
-            return [pid for pid in derived if self._perm_matches_spec(pid, target, derived, source_perm)]
+            # Creature selectors read the creature index instead of testing every permanent.
+            selector = target.selector
+            creatures = self._creatures_by_controller
+            if selector in (Selector.ANY_CREATURE, Selector.TARGET_CREATURE):
+                candidates: Iterable[Dict[str, None]] = creatures.values()
+            elif selector == Selector.TARGET_CREATURE_YOU_CONTROL and source_perm is not None:
+                candidates = (creatures.get(source_perm.controller_id, {}),)
+            elif selector == Selector.TARGET_CREATURE_OPPONENT_CONTROLS and source_perm is not None:
+                candidates = [ids for player_id, ids in creatures.items() if player_id != source_perm.controller_id]
+            else:
+                return [pid for pid in derived if self._perm_matches_spec(pid, target, derived, source_perm)]
+            matched: List[str] = []
+            for ids in candidates:
+                for pid in ids:
+                    d = derived.get(pid)
+                    if d is not None and d.base_power is not None:
+                        matched.append(pid)
+            return matched
         return []
 
     def _perm_matches_spec(
         self,
         perm_id: str,
         spec: TargetSpec,
-        derived: Dict[str, Dict[str, Any]],
+        derived: Dict[str, _DerivedPerm],
         source_perm: Optional[Permanent],
     ) -> bool:
         d = derived.get(perm_id)
@@ -3914,11 +4529,11 @@ class MTGEngine:
         if spec.zone != Zone.BATTLEFIELD:
             return False
         if spec.selector in (Selector.ANY_CREATURE, Selector.TARGET_CREATURE):
-            return d["base_power"] is not None
+            return d.base_power is not None
         if spec.selector == Selector.TARGET_CREATURE_YOU_CONTROL and source_perm is not None:
-            return d["base_power"] is not None and d["controller_id"] == source_perm.controller_id
+            return d.base_power is not None and d.controller_id == source_perm.controller_id
         if spec.selector == Selector.TARGET_CREATURE_OPPONENT_CONTROLS and source_perm is not None:
-            return d["base_power"] is not None and d["controller_id"] != source_perm.controller_id
+            return d.base_power is not None and d.controller_id != source_perm.controller_id
         return False
 
     def _condition_met(
@@ -3926,7 +4541,7 @@ class MTGEngine:
         condition: Optional[Dict[str, Any]],
         source_perm: Optional[Permanent],
         controller_id: Optional[str],
-        derived: Dict[str, Dict[str, Any]],
+        derived: Dict[str, _DerivedPerm],
     ) -> bool:
         if not condition:
             return True
@@ -3935,66 +4550,71 @@ class MTGEngine:
         if "control_subtype" in condition and controller_id is not None:
             subtype = condition.get("control_subtype")
             for d in derived.values():
-                if d["controller_id"] == controller_id and subtype in d["subtypes"]:
+                if d.controller_id == controller_id and subtype in d.subtypes:
                     return True
             return False
         return True
 
-    def _creature_can_attack(self, perm: Permanent, derived: Dict[str, Dict[str, Any]], defender_id: str) -> bool:
+    def _creature_can_attack(self, perm: Permanent, derived: Dict[str, _DerivedPerm], defender_id: str) -> bool:
         d = derived.get(perm.instance.instance_id)
-        if d is None or d["base_power"] is None:
+        if d is None or d.base_power is None:
             return False
         if perm.state.tapped:
             return False
-        if perm.state.summoning_sick and Keyword.HASTE not in d["keywords"]:
+        if perm.state.summoning_sick and not d.kw_mask & _HASTE_BIT:
             return False
-        if Keyword.DEFENDER in d["keywords"]:
+        if d.kw_mask & _DEFENDER_BIT:
             return False
-        if defender_id in d["cant_attack_players"]:
+        if defender_id in d.cant_attack_players:
             return False
         return True
 
-    def _creature_can_block(self, blocker: Permanent, attacker_id: str, derived: Dict[str, Dict[str, Any]]) -> bool:
+    def _creature_can_block(self, blocker: Permanent, attacker_id: str, derived: Dict[str, _DerivedPerm]) -> bool:
         d_blocker = derived.get(blocker.instance.instance_id)
         d_attacker = derived.get(attacker_id)
-        if d_blocker is None or d_blocker["base_power"] is None:
+        if d_blocker is None or d_blocker.base_power is None:
             return False
         if blocker.state.tapped:
             return False
         if d_attacker is None:
             return False
-        if Keyword.FLYING in d_attacker["keywords"]:
-            if Keyword.FLYING not in d_blocker["keywords"] and Keyword.REACH not in d_blocker["keywords"]:
-                return False
+        if d_attacker.kw_mask & _FLYING_BIT and not d_blocker.kw_mask & (_FLYING_BIT | _REACH_BIT):
+            return False
         return True
 
     def _attack_tax_amount(self, defender_id: str) -> int:
-        amount = 0
-        for temp in self.game.temporary_effects:
-            if temp.effect.type != EffectType.ATTACK_TAX:
-                continue
-            if not self._temp_effect_active(temp):
-                continue
-            if temp.controller_id != defender_id:
-                continue
-            amount += int(temp.effect.params.get("amount", 0) or 0)
-        return amount
+        # Temporary effects and the turn position both bump _derived_version, so the
+        # per-defender totals are valid until it changes.
+        if self._attack_tax_version != self._derived_version:
+            totals: Dict[str, int] = {}
+            for temp in self.game.temporary_effects:
+                if temp.effect.type != EffectType.ATTACK_TAX:
+                    continue
+                if not self._temp_effect_active(temp):
+                    continue
+                amount = int(temp.effect.params.get("amount", 0) or 0)
+                totals[temp.controller_id] = totals.get(temp.controller_id, 0) + amount
+            self._attack_tax_totals = totals
+            self._attack_tax_version = self._derived_version
+        return self._attack_tax_totals.get(defender_id, 0)
 
     def _return_exiled_for_source(self, source_instance_id: str) -> None:
-        to_return = [eid for eid, sid in self.game.exile_links.items() if sid == source_instance_id]
+        to_return = self._exiled_by_source.pop(source_instance_id, None)
+        if not to_return:
+            return
         for eid in to_return:
             card = self.game.zones.exile.pop(eid, None)
             self.game.exile_links.pop(eid, None)
             if card is None or card.is_token:
                 continue
             perm = Permanent(instance=card, controller_id=card.owner_id)
-            self.game.zones.battlefield[card.instance_id] = perm
+            self._put_onto_battlefield(perm)
             self._handle_etb(perm)
             self._handle_creature_enters(perm)
 
     def _can_pay_generic_cost(self, pool: Any, amount: int) -> bool:
-        total = int(pool.generic) + sum(int(v) for v in pool.colored.values())
-        return total >= amount
+        # ManaPool.validate guarantees int counts, so the C-level sum needs no per-value int().
+        return pool.generic + sum(pool.colored.values()) >= amount
 
     def _pay_generic_cost(self, pool: Any, amount: int) -> None:
         remaining = int(amount)
@@ -4005,16 +4625,16 @@ class MTGEngine:
         remaining -= use_generic
         if remaining <= 0:
             return
-        for color in sorted(list(pool.colored.keys())):
+        colored = pool.colored
+        order = _SPEND_ORDER if colored.keys() <= _SPEND_ORDER_SET else sorted(colored)
+        for color in order:
             if remaining <= 0:
                 break
-            available = pool.colored.get(color, 0)
+            available = colored.get(color, 0)
             if available <= 0:
                 continue
             spend = min(available, remaining)
-            pool.colored[color] = available - spend
-            if pool.colored[color] <= 0:
-                pool.colored.pop(color, None)
+            _set_pool_count(colored, color, available - spend)
             remaining -= spend
 
     def _count_subtype_on_battlefield(
@@ -4023,71 +4643,97 @@ class MTGEngine:
         controller_id: Optional[str] = None,
         exclude_id: Optional[str] = None,
     ) -> int:
+        by_controller = self._subtype_index.get(subtype)
+        if not by_controller:
+            return 0
+        if controller_id is not None:
+            ids = by_controller.get(controller_id)
+            if not ids:
+                return 0
+            return len(ids) - (1 if exclude_id and exclude_id in ids else 0)
+        buckets = by_controller.values()
         count = 0
-        for perm in self.game.zones.battlefield.values():
-            if exclude_id and perm.instance.instance_id == exclude_id:
-                continue
-            if controller_id is not None and perm.controller_id != controller_id:
-                continue
-            card = self.game.card_db.get(perm.instance.card_id)
-            if card and subtype in card.subtypes:
-                count += 1
+        for ids in buckets:
+            count += len(ids)
+            if exclude_id and exclude_id in ids:
+                count -= 1
         return count
 
     def _trigger_condition_met(self, condition: Optional[Dict[str, Any]], source_perm: Permanent, context: Dict[str, Any]) -> bool:
         if not condition:
             return True
+        entry = self._trigger_conditions.get(id(condition))
+        if entry is None:
+            entry = self._compile_trigger_condition(condition)
+        check, arg = entry
+        return check(arg, source_perm, context)
+
+    def _compile_trigger_condition(self, condition: Dict[str, Any]) -> Tuple[Callable[..., bool], Any]:
+        """Pick the check for a condition dict once; the first matching key decides, as listed here."""
         if condition.get("during_opponent_turn"):
-            caster_id = context.get("caster_id")
-            return caster_id is not None and self.game.turn.active_player_id != caster_id
+            return self._condition_cast_on_opponent_turn, None
         if condition.get("controller") == "YOU":
-            entered_perm = context.get("entered_perm")
-            return entered_perm is not None and entered_perm.controller_id == source_perm.controller_id
+            return self._condition_entered_under_your_control, None
         if condition.get("controller") == "OPPONENT":
-            source_controller = context.get("source_controller_id")
-            return source_controller is not None and source_controller != source_perm.controller_id
+            return self._condition_opponent_source, None
         if "has_keyword" in condition:
-            entered_perm = context.get("entered_perm")
-            if entered_perm is None:
-                return False
-            derived = self._derived_battlefield_state()
-            d = derived.get(entered_perm.instance.instance_id)
-            if d is None:
-                return False
-            try:
-                kw = Keyword[condition.get("has_keyword")]
-            except Exception:
-                return False
-            return kw in d["keywords"]
+            kw = _KEYWORDS_BY_NAME.get(condition.get("has_keyword"))
+            return self._condition_entered_has_keyword, _KEYWORD_BITS[kw] if kw is not None else 0
         if "subtype" in condition:
-            entered_perm = context.get("entered_perm")
-            if entered_perm is None:
-                return False
-            card = self.game.card_db.get(entered_perm.instance.card_id)
-            if card is None:
-                return False
-            return condition.get("subtype") in card.subtypes
-        if "spell_type" in condition:
-            spell_card = context.get("spell_card")
-            if spell_card is None:
-                return False
-            if condition.get("spell_type") == "CREATURE":
-                return CardType.CREATURE in spell_card.card_types
-            if condition.get("spell_type") == "INSTANT_OR_SORCERY":
-                return CardType.INSTANT in spell_card.card_types or CardType.SORCERY in spell_card.card_types
+            return self._condition_entered_has_subtype, condition.get("subtype")
+        spell_types = _CONDITION_SPELL_TYPES.get(condition.get("spell_type"))
+        if spell_types is not None:
+            return self._condition_spell_type, spell_types
         if "control_subtype_count" in condition:
             info = condition.get("control_subtype_count") or {}
-            subtype = info.get("subtype")
-            min_count = int(info.get("min", 0))
-            count = 0
-            for perm in self.game.zones.battlefield.values():
-                if perm.controller_id != source_perm.controller_id:
-                    continue
-                card = self.game.card_db.get(perm.instance.card_id)
-                if card and subtype in card.subtypes:
-                    count += 1
-            return count >= min_count
-        return True
+            return self._condition_control_subtype_count, (info.get("subtype"), int(info.get("min", 0)))
+        return _condition_always, None
+
+    # Trigger condition checks: (arg, source_perm, context) -> bool.
+
+    def _condition_cast_on_opponent_turn(self, _arg: None, source_perm: Permanent, context: Dict[str, Any]) -> bool:
+        caster_id = context.get("caster_id")
+        return caster_id is not None and self.game.turn.active_player_id != caster_id
+
+    def _condition_entered_under_your_control(
+        self, _arg: None, source_perm: Permanent, context: Dict[str, Any]
+    ) -> bool:
+        entered_perm = context.get("entered_perm")
+        return entered_perm is not None and entered_perm.controller_id == source_perm.controller_id
+
+    def _condition_opponent_source(self, _arg: None, source_perm: Permanent, context: Dict[str, Any]) -> bool:
+        source_controller = context.get("source_controller_id")
+        return source_controller is not None and source_controller != source_perm.controller_id
+
+    def _condition_entered_has_keyword(self, bit: int, source_perm: Permanent, context: Dict[str, Any]) -> bool:
+        entered_perm = context.get("entered_perm")
+        if entered_perm is None or not bit:
+            return False
+        mask = context.get("entered_kw_mask")
+        if mask is None:
+            d = self._derived_battlefield_state().get(entered_perm.instance.instance_id)
+            mask = context["entered_kw_mask"] = d.kw_mask if d is not None else 0
+        return bool(mask & bit)
+
+    def _condition_entered_has_subtype(self, subtype: Any, source_perm: Permanent, context: Dict[str, Any]) -> bool:
+        entered_perm = context.get("entered_perm")
+        if entered_perm is None:
+            return False
+        return subtype in self._card_subtypes[entered_perm.instance.card_id]
+
+    def _condition_spell_type(
+        self, card_types: Tuple[CardType, ...], source_perm: Permanent, context: Dict[str, Any]
+    ) -> bool:
+        spell_card = context.get("spell_card")
+        if spell_card is None:
+            return False
+        return any(t in spell_card.card_types for t in card_types)
+
+    def _condition_control_subtype_count(
+        self, arg: Tuple[Any, int], source_perm: Permanent, context: Dict[str, Any]
+    ) -> bool:
+        subtype, min_count = arg
+        return self._count_subtype_on_battlefield(subtype, controller_id=source_perm.controller_id) >= min_count
 
     def _materialize_trigger_effects(
         self,
@@ -4104,7 +4750,7 @@ class MTGEngine:
             if amount == "LIFE_LOST":
                 params["amount"] = int(context.get("life_lost", 0))
             if amount == "COUNTERS_ON_SELF":
-                params["amount"] = int(source_perm.state.counters.get("+1/+1", 0))
+                params["amount"] = int(source_perm.state.counters.get(_PLUS_ONE_COUNTER, 0))
             if params.get("target") == "TRIGGER_SOURCE":
                 params["target"] = {"type": "PERMANENT", "instance_id": context.get("trigger_source_id", source_perm.instance.instance_id)}
             if params.get("chooser") == "DAMAGED_PLAYER":
@@ -4125,7 +4771,7 @@ class MTGEngine:
             if amount == "SACRIFICED_TOUGHNESS":
                 params["amount"] = int(context.get("sacrificed_toughness", 0))
             if amount == "COUNTERS_ON_SELF" and source_perm is not None:
-                params["amount"] = int(source_perm.state.counters.get("+1/+1", 0))
+                params["amount"] = int(source_perm.state.counters.get(_PLUS_ONE_COUNTER, 0))
             materialized.append(Effect(type=eff.type, params=params))
         return materialized
 
@@ -4151,21 +4797,40 @@ class MTGEngine:
         queue = self.game.pending_decision.context.setdefault("queue", [])
         queue.append({"trigger": trigger_info, "options": options})
 
-    def _queue_triggered_ability(self, source_perm: Permanent, ability: Any, context: Dict[str, Any]) -> None:
+    def _trigger_visible_state(
+        self, controller_id: str, snapshots: _TriggerSnapshots
+    ) -> Tuple[VisibleState, Dict[str, Any]]:
+        """Visible state (and battlefield views by instance id) for targeting a trigger.
+
+        snapshots belongs to one _handle_* call, so it never outlives the event. Within an event
+        only the stack moves between triggers, so its length is part of the key; a handler that
+        changes anything else mid-event clears it.
+        """
+        key = (controller_id, len(self.game.zones.stack))
+        snapshot = snapshots.get(key)
+        if snapshot is None:
+            visible = self.get_visible_state(controller_id)
+            views = {getattr(p, "instance_id", None): p for p in visible.zones.battlefield}
+            snapshot = snapshots[key] = (visible, views)
+        return snapshot
+
+    def _queue_triggered_ability(
+        self,
+        source_perm: Permanent,
+        ability: Any,
+        context: Dict[str, Any],
+        snapshots: _TriggerSnapshots,
+    ) -> None:
         controller_id = source_perm.controller_id
         effects = self._materialize_trigger_effects(ability.effects, source_perm, context)
 
         if self._effects_need_targets(effects):
-            visible = self.get_visible_state(controller_id)
-            source_view = next(
-                (p for p in visible.zones.battlefield if getattr(p, "instance_id", None) == source_perm.instance.instance_id),
-                None,
-            )
-            options = ActionSurface()._enumerate_targets_for_effects(
+            visible, views = self._trigger_visible_state(controller_id, snapshots)
+            options = self._trigger_surface._enumerate_targets_for_effects(
                 effects,
                 visible,
                 controller_id,
-                source_perm=source_view,
+                source_perm=views.get(source_perm.instance.instance_id),
             )
             if options and options != [[]]:
                 trigger_info = {
@@ -4176,7 +4841,7 @@ class MTGEngine:
                 self._enqueue_trigger_decision(trigger_info, options)
                 return
 
-        self.game.zones.stack.append(
+        self._push_stack(
             StackItem(
                 kind=StackItemKind.ABILITY,
                 controller_id=controller_id,
@@ -4187,144 +4852,123 @@ class MTGEngine:
             )
         )
 
+    def _triggers_for(self, card_id: str, trigger: TriggerType) -> Tuple[Any, ...]:
+        return self._card_triggers.get((card_id, trigger), ())
+
+    def _permanents_with_trigger(
+        self, trigger: TriggerType, controller_id: Optional[str] = None
+    ) -> Iterator[Permanent]:
+        """Battlefield permanents with a triggered ability of this type (optionally only those
+        controlled by controller_id), in battlefield order."""
+        if controller_id is not None:
+            return iter(self._bf_by_trigger_controller.get((trigger, controller_id), {}).values())
+        return iter(self._bf_by_trigger.get(trigger, {}).values())
+
     def _handle_etb(self, perm: Permanent) -> None:
-        card = self.game.card_db.get(perm.instance.card_id)
-        if card is None:
-            return
-        for ability in card.rules.triggered_abilities:
-            if ability.trigger != TriggerType.ETB:
-                continue
+        snapshots: _TriggerSnapshots = {}
+        for ability in self._triggers_for(perm.instance.card_id, TriggerType.ETB):
             if not self._trigger_condition_met(ability.condition, perm, {}):
                 continue
-            self._queue_triggered_ability(perm, ability, {"trigger_source_id": perm.instance.instance_id})
+            self._queue_triggered_ability(perm, ability, {"trigger_source_id": perm.instance.instance_id}, snapshots)
 
     def _handle_creature_enters(self, perm: Permanent) -> None:
-        card = self.game.card_db.get(perm.instance.card_id)
-        if card is None or CardType.CREATURE not in card.card_types:
+        snapshots: _TriggerSnapshots = {}
+        if not self._is_creature(perm):
             return
-        for source_perm in self.game.zones.battlefield.values():
-            source_card = self.game.card_db.get(source_perm.instance.card_id)
-            if source_card is None:
-                continue
-            for ability in source_card.rules.triggered_abilities:
-                if ability.trigger != TriggerType.CREATURE_ENTERS:
-                    continue
-                context = {"entered_perm": perm, "trigger_source_id": perm.instance.instance_id}
+        # One context for the event, so has_keyword conditions share the entered creature's keyword mask.
+        context: Dict[str, Any] = {"entered_perm": perm, "trigger_source_id": perm.instance.instance_id}
+        for source_perm in self._permanents_with_trigger(TriggerType.CREATURE_ENTERS):
+            for ability in self._triggers_for(source_perm.instance.card_id, TriggerType.CREATURE_ENTERS):
                 if not self._trigger_condition_met(ability.condition, source_perm, context):
                     continue
-                self._queue_triggered_ability(source_perm, ability, context)
+                self._queue_triggered_ability(source_perm, ability, context, snapshots)
 
     def _handle_cast_spell(self, caster_id: str, spell_card: Any) -> None:
-        for perm in self.game.zones.battlefield.values():
-            perm_card = self.game.card_db.get(perm.instance.card_id)
-            if perm_card is None:
-                continue
-            for ability in perm_card.rules.triggered_abilities:
-                if ability.trigger != TriggerType.CAST_SPELL:
-                    continue
+        snapshots: _TriggerSnapshots = {}
+        for perm in self._permanents_with_trigger(TriggerType.CAST_SPELL):
+            for ability in self._triggers_for(perm.instance.card_id, TriggerType.CAST_SPELL):
                 context = {"caster_id": caster_id, "spell_card": spell_card}
                 if not self._trigger_condition_met(ability.condition, perm, context):
                     continue
-                self._queue_triggered_ability(perm, ability, context)
+                self._queue_triggered_ability(perm, ability, context, snapshots)
 
     def _handle_attacks(self, attacker_ids: List[str]) -> None:
+        snapshots: _TriggerSnapshots = {}
         attachments = self._attachments_by_host()
         for attacker_id in attacker_ids:
             perm = self.game.zones.battlefield.get(attacker_id)
             if perm is None:
                 continue
-            card = self.game.card_db.get(perm.instance.card_id)
-            if card is None:
-                continue
+            attack_triggers = self._card_attack_triggers[perm.instance.card_id]
             if perm.state.draw_on_attack_by and perm.state.draw_on_attack_until_turn is not None:
                 if self.game.turn.turn_number <= perm.state.draw_on_attack_until_turn:
                     defending_player = self._other_player(perm.controller_id)
                     if self._other_player(perm.state.draw_on_attack_by) == defending_player:
                         self._draw(perm.state.draw_on_attack_by, 1)
-            for ability in card.rules.triggered_abilities:
-                if ability.trigger in (TriggerType.ATTACKS, TriggerType.ATTACKS_OR_BLOCKS):
-                    self._queue_triggered_ability(perm, ability, {"trigger_source_id": perm.instance.instance_id})
+                        snapshots.clear()
+            for ability in attack_triggers:
+                self._queue_triggered_ability(perm, ability, {"trigger_source_id": attacker_id}, snapshots)
 
             # Equipped creature attacks triggers on equipment
             for eq_id in attachments.get(attacker_id, []):
                 eq_perm = self.game.zones.battlefield.get(eq_id)
                 if eq_perm is None:
                     continue
-                eq_card = self.game.card_db.get(eq_perm.instance.card_id)
-                if eq_card is None:
-                    continue
-                for ability in eq_card.rules.triggered_abilities:
-                    if ability.trigger == TriggerType.EQUIPPED_CREATURE_ATTACKS:
-                        self._queue_triggered_ability(eq_perm, ability, {"trigger_source_id": attacker_id})
+                eq_triggers = self._triggers_for(eq_perm.instance.card_id, TriggerType.EQUIPPED_CREATURE_ATTACKS)
+                for ability in eq_triggers:
+                    self._queue_triggered_ability(eq_perm, ability, {"trigger_source_id": attacker_id}, snapshots)
 
     def _handle_blocks(self, blocker_ids: List[str]) -> None:
+        snapshots: _TriggerSnapshots = {}
         for blocker_id in blocker_ids:
             perm = self.game.zones.battlefield.get(blocker_id)
             if perm is None:
                 continue
-            card = self.game.card_db.get(perm.instance.card_id)
-            if card is None:
-                continue
-            for ability in card.rules.triggered_abilities:
-                if ability.trigger == TriggerType.ATTACKS_OR_BLOCKS:
-                    self._queue_triggered_ability(perm, ability, {"trigger_source_id": perm.instance.instance_id})
+            for ability in self._triggers_for(perm.instance.card_id, TriggerType.ATTACKS_OR_BLOCKS):
+                self._queue_triggered_ability(perm, ability, {"trigger_source_id": perm.instance.instance_id}, snapshots)
 
     def _handle_combat_damage_to_player(self, source_id: str, player_id: str) -> None:
+        snapshots: _TriggerSnapshots = {}
         perm = self.game.zones.battlefield.get(source_id)
         if perm is None:
             return
-        card = self.game.card_db.get(perm.instance.card_id)
-        if card is None:
-            return
-        for ability in card.rules.triggered_abilities:
-            if ability.trigger == TriggerType.COMBAT_DAMAGE_TO_PLAYER:
-                self._queue_triggered_ability(perm, ability, {"damaged_player_id": player_id})
+        for ability in self._triggers_for(perm.instance.card_id, TriggerType.COMBAT_DAMAGE_TO_PLAYER):
+            self._queue_triggered_ability(perm, ability, {"damaged_player_id": player_id}, snapshots)
 
     def _handle_dealt_damage(self, target_id: str, amount: int) -> None:
+        snapshots: _TriggerSnapshots = {}
         perm = self.game.zones.battlefield.get(target_id)
         if perm is None:
             return
-        card = self.game.card_db.get(perm.instance.card_id)
-        if card is None:
-            return
-        for ability in card.rules.triggered_abilities:
-            if ability.trigger == TriggerType.DEALT_DAMAGE:
-                self._queue_triggered_ability(perm, ability, {"damage": amount})
+        for ability in self._triggers_for(perm.instance.card_id, TriggerType.DEALT_DAMAGE):
+            self._queue_triggered_ability(perm, ability, {"damage": amount}, snapshots)
 
     def _handle_you_lose_life(self, player_id: str, amount: int) -> None:
-        for perm in self.game.zones.battlefield.values():
-            if perm.controller_id != player_id:
-                continue
-            card = self.game.card_db.get(perm.instance.card_id)
-            if card is None:
-                continue
-            for ability in card.rules.triggered_abilities:
-                if ability.trigger == TriggerType.YOU_LOSE_LIFE:
-                    self._queue_triggered_ability(perm, ability, {"life_lost": amount})
+        snapshots: _TriggerSnapshots = {}
+        for perm in self._permanents_with_trigger(TriggerType.YOU_LOSE_LIFE, player_id):
+            for ability in self._triggers_for(perm.instance.card_id, TriggerType.YOU_LOSE_LIFE):
+                self._queue_triggered_ability(perm, ability, {"life_lost": amount}, snapshots)
 
     def _handle_becomes_target(self, target_id: str, source_controller_id: str) -> None:
+        snapshots: _TriggerSnapshots = {}
         perm = self.game.zones.battlefield.get(target_id)
         if perm is None:
             return
-        card = self.game.card_db.get(perm.instance.card_id)
-        if card is None:
-            return
-        for ability in card.rules.triggered_abilities:
-            if ability.trigger != TriggerType.BECOMES_TARGET:
-                continue
+        for ability in self._triggers_for(perm.instance.card_id, TriggerType.BECOMES_TARGET):
             context = {"source_controller_id": source_controller_id}
             if not self._trigger_condition_met(ability.condition, perm, context):
                 continue
-            self._queue_triggered_ability(perm, ability, context)
+            self._queue_triggered_ability(perm, ability, context, snapshots)
 
-    def _handle_dies(self, perm: Permanent) -> None:
-        card = self.game.card_db.get(perm.instance.card_id)
-        if card is None:
-            return
-        derived = self._derived_battlefield_state()
+    def _handle_dies(self, perm: Permanent, derived: Optional[Dict[str, _DerivedPerm]] = None) -> None:
+        """derived: a snapshot taken before a wave of simultaneous deaths (state-based actions), so
+        each death reads last-known keywords without recomputing after every earlier removal."""
+        snapshots: _TriggerSnapshots = {}
+        if derived is None:
+            derived = self._derived_battlefield_state()
         d = derived.get(perm.instance.instance_id)
-        if d and Keyword.UNDEAD_RETURN in d.get("keywords", set()):
-            self.game.zones.stack.append(
+        if d is not None and d.kw_mask & _UNDEAD_RETURN_BIT:
+            self._push_stack(
                 StackItem(
                     kind=StackItemKind.ABILITY,
                     controller_id=perm.controller_id,
@@ -4334,41 +4978,41 @@ class MTGEngine:
                     meta={"trigger": "UNDEAD_RETURN"},
                 )
             )
-        for ability in card.rules.triggered_abilities:
-            if ability.trigger == TriggerType.DIES:
-                self._queue_triggered_ability(perm, ability, {})
+        for ability in self._triggers_for(perm.instance.card_id, TriggerType.DIES):
+            self._queue_triggered_ability(perm, ability, {}, snapshots)
 
-        for other in self.game.zones.battlefield.values():
-            other_card = self.game.card_db.get(other.instance.card_id)
-            if other_card is None:
+        watchers = self._bf_other_dies_watchers
+        if not watchers:
+            return
+        # Both watcher kinds share one index so their triggers queue in battlefield order.
+        queue = self._queue_triggered_ability
+        dying_id = perm.instance.instance_id
+        dying_controller = perm.controller_id
+        active_player = self.game.turn.active_player_id
+        for other_id, (other, controller_id, kinds, abilities) in watchers.items():
+            firing = 0
+            if controller_id == dying_controller:
+                firing |= _DIES_WATCH_FRIENDLY
+            if controller_id == active_player:
+                firing |= _DIES_WATCH_YOUR_TURN
+            # Skip watchers none of whose trigger kinds can fire for this death.
+            if not kinds & firing:
+                continue
+            if other_id == dying_id:
                 continue
-            for ability in other_card.rules.triggered_abilities:
-                if ability.trigger == TriggerType.OTHER_FRIENDLY_DIES:
-                    if other.controller_id == perm.controller_id and other.instance.instance_id != perm.instance.instance_id:
-                        self._queue_triggered_ability(other, ability, {})
-                if ability.trigger == TriggerType.OTHER_DIES_DURING_YOUR_TURN:
-                    if self.game.turn.active_player_id == other.controller_id and other.instance.instance_id != perm.instance.instance_id:
-                        self._queue_triggered_ability(other, ability, {})
+            for kind, ability in abilities:
+                if kind & firing:
+                    queue(other, ability, {}, snapshots)
 
     def _handle_upkeep(self, player_id: str) -> None:
-        for perm in self.game.zones.battlefield.values():
-            if perm.controller_id != player_id:
-                continue
-            card = self.game.card_db.get(perm.instance.card_id)
-            if card is None:
-                continue
-            for ability in card.rules.triggered_abilities:
-                if ability.trigger == TriggerType.UPKEEP:
-                    self._queue_triggered_ability(perm, ability, {})
-    def _basic_land_produces(self, card_id: str) -> Optional[Dict[str, int]]:
-        card = self.game.card_db.get(card_id)
-        if card is not None and card.land_stats is not None:
-            return {c.value: n for c, n in card.land_stats.produces.items()}
-        mapping = {
-            "basic_swamp": {"BLACK": 1},
-            "basic_mountain": {"RED": 1},
-            "basic_island": {"BLUE": 1},
-            "basic_forest": {"GREEN": 1},
-            "basic_plains": {"WHITE": 1},
-        }
-        return mapping.get(card_id)
+        snapshots: _TriggerSnapshots = {}
+        for perm in self._permanents_with_trigger(TriggerType.UPKEEP, player_id):
+            for ability in self._triggers_for(perm.instance.card_id, TriggerType.UPKEEP):
+                self._queue_triggered_ability(perm, ability, {}, snapshots)
+
+    def _basic_land_produces(self, card_id: str) -> Optional[Mapping[str, int]]:
+        """Mana a land taps for, by colour name; shared and read-only."""
+        produces = self._land_produces.get(card_id)
+        if produces is not None:
+            return produces
+        return _BASIC_LAND_PRODUCES.get(card_id)
@@ -36,7 +36,7 @@ class Step(str, Enum):
 # Card / Permanent Instances
 # ============================
 
-@dataclass
+@dataclass(slots=True)
 class CardInstance:
     """
     A physical card in a game.
@@ -56,7 +56,7 @@ class CardInstance:
             raise ValueError("CardInstance.owner_id must be non-empty")
 
 
-@dataclass
+@dataclass(slots=True)
 class PermanentState:
     tapped: bool = False
     damage_marked: int = 0
@@ -78,7 +78,7 @@ class PermanentState:
                 raise ValueError(f"PermanentState.counters[{k!r}] must be >= 0")
 
 
-@dataclass
+@dataclass(slots=True)
 class Permanent:
     """
     A card on the battlefield with mutable state.
@@ -94,13 +94,12 @@ class Permanent:
         self.state.validate()
 
 
-@dataclass
 class StackItemKind(str, Enum):
     SPELL = "SPELL"
     ABILITY = "ABILITY"
 
 
-@dataclass
+@dataclass(slots=True)
 class StackItem:
     kind: StackItemKind
     controller_id: str
@@ -123,7 +122,7 @@ class StackItem:
 # Turn State
 # ============================
 
-@dataclass
+@dataclass(slots=True)
 class TurnState:
     active_player_id: str
     turn_number: int
@@ -168,7 +167,7 @@ class TurnState:
 # RNG State
 # ============================
 
-@dataclass
+@dataclass(slots=True)
 class RandomState:
     seed: int
     rng: random.Random = field(init=False)
@@ -212,7 +211,7 @@ class GlobalZones:
 # Game Metadata
 # ============================
 
-@dataclass
+@dataclass(slots=True)
 class GameMetadata:
     history: List[str] = field(default_factory=list)
 
@@ -225,7 +224,7 @@ class GameMetadata:
 # ============================
 
 
-@dataclass
+@dataclass(slots=True)
 class TemporaryEffect:
     effect: Any
     source_instance_id: Optional[str]
@@ -234,7 +233,7 @@ class TemporaryEffect:
     expires_step: Optional[Step] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class PendingDecision:
     player_id: str
     kind: str
@@ -260,7 +259,6 @@ class GameState:
     metadata: GameMetadata = field(default_factory=GameMetadata)
     temporary_effects: List[TemporaryEffect] = field(default_factory=list)
     exile_links: Dict[str, str] = field(default_factory=dict)  # exiled_instance_id -> source_instance_id
-    damage_dealt_to_players: Dict[str, int] = field(default_factory=dict)
     pending_decision: Optional[PendingDecision] = None
     extra_turns: List[str] = field(default_factory=list)
     game_over: bool = False
@@ -295,14 +293,12 @@ class GameState:
             if self.winner_id is not None and self.winner_id not in self.players:
                 raise ValueError("Winner must be a valid player id")
 
-        # Invariant: all battlefield permanents must belong to a known player
+        # Invariant: all battlefield permanents must belong to a known player and card
         for perm in self.zones.battlefield.values():
             if perm.controller_id not in self.players:
                 raise ValueError("Permanent.controller_id must be a valid player")
-
-        for pid in self.damage_dealt_to_players.keys():
-            if pid not in self.players:
-                raise ValueError("damage_dealt_to_players must reference valid players")
+            if perm.instance.card_id not in self.card_db:
+                raise ValueError("Permanent.card_id must be in card_db")
 
         if self.pending_decision is not None:
             if self.pending_decision.player_id not in self.players:
@@ -317,14 +313,21 @@ class GameState:
     # ============================
 
     @staticmethod
-    def new_game(players: Dict[str, "PlayerState"], seed: Optional[int] = None) -> "GameState":
+    def new_game(
+        players: Dict[str, "PlayerState"],
+        seed: Optional[int] = None,
+        game_id: Optional[str] = None,
+    ) -> "GameState":
+        """game_id defaults to a fresh uuid4; rollouts that never read it can pass a cheap id."""
         if seed is None:
             seed = random.randrange(1 << 30)
+        if game_id is None:
+            game_id = str(uuid.uuid4())
 
-        starting_player_id = list(players.keys())[0]
+        starting_player_id = next(iter(players))
 
         game = GameState(
-            game_id=str(uuid.uuid4()),
+            game_id=game_id,
             players=players,
             card_db={},
             starting_player_id=starting_player_id,
@@ -338,5 +341,7 @@ class GameState:
             rng=RandomState(seed=seed),
         )
 
-        game.validate()
+        # Under `python -O` this skips validating the caller-supplied players and their zones.
+        if __debug__:
+            game.validate()
         return game
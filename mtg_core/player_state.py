@@ -6,7 +6,7 @@ from typing import Dict, List, Optional
 from mtg_core.game_state import CardInstance
 
 
-@dataclass
+@dataclass(slots=True)
 class ManaPool:
     colored: Dict[str, int] = field(default_factory=dict)  # keys: "BLACK", "RED", etc
     generic: int = 0
@@ -25,7 +25,7 @@ class ManaPool:
                 raise ValueError("ManaPool.colored values must be ints >= 0")
 
 
-@dataclass
+@dataclass(slots=True)
 class PlayerState:
     player_id: str
 
@@ -43,6 +43,7 @@ class PlayerState:
 
     # Turn-scoped
     lands_played_this_turn: int = 0
+    damage_taken_this_turn: int = 0
 
     # Pregame mulligan (London)
     mulligans_taken: int = 0
@@ -70,6 +71,8 @@ class PlayerState:
 
         if self.lands_played_this_turn < 0:
             raise ValueError("lands_played_this_turn must be >= 0")
+        if self.damage_taken_this_turn < 0:
+            raise ValueError("damage_taken_this_turn must be >= 0")
 
         if self.mulligans_taken < 0:
             raise ValueError("mulligans_taken must be >= 0")
@@ -12,6 +12,17 @@ from mtg_core.actions import Action, ActionType
 from mtg_core.aibase import VisibleState
 from mtg_core.action_surface import ActionSurface
 
+# Colour keys in WUBRG display order with their mana symbols.
+_MANA_SYMBOLS = (("WHITE", "{W}"), ("BLUE", "{U}"), ("BLACK", "{B}"), ("RED", "{R}"), ("GREEN", "{G}"))
+
+# Action types whose label does not depend on the action's object or targets.
+_FIXED_ACTION_LABELS = {
+    ActionType.PASS_PRIORITY: "Pass priority",
+    ActionType.SCOOP: "Scoop",
+    ActionType.SKIP_COMBAT: "Skip combat",
+    ActionType.SKIP_MAIN2: "Skip main 2",
+}
+
 
 class _TurnApp(App[Optional[int]]):
     BINDINGS = [("q", "quit", "Quit")]
@@ -22,6 +33,31 @@ class _TurnApp(App[Optional[int]]):
         self._actions = actions
         self._player_id = player_id
         self._error: str = ""
+        # Set when state shown on screen changed; a render is queued for after the next refresh.
+        self._dirty = False
+        # (signature, panel) per widget so unchanged panels are not rebuilt or re-sent to Textual.
+        self._panel_cache: dict[str, tuple[tuple[Any, ...], Panel]] = {}
+        # instance_id lookups for action labels. The app shows one visible state for its lifetime;
+        # built in reverse so the first entry wins if an id repeats, like the old linear scans.
+        self._hand_idx: dict[Any, Any] = {
+            getattr(ci, "instance_id", None): ci for ci in reversed(visible.zones.hand)
+        }
+        self._bf_idx: dict[Any, Any] = {
+            getattr(perm, "instance_id", None): perm for perm in reversed(visible.zones.battlefield)
+        }
+        self._pass_idx: Optional[int] = next(
+            (i for i, action in enumerate(actions) if action.type == ActionType.PASS_PRIORITY),
+            None,
+        )
+        self._fmt_dispatch: dict[ActionType, Callable[[Action], str]] = {
+            ActionType.PLAY_LAND: self._fmt_play_land,
+            ActionType.TAP_FOR_MANA: self._fmt_tap_for_mana,
+            ActionType.CAST_SPELL: self._fmt_cast_spell,
+            ActionType.DECLARE_ATTACKERS: self._fmt_declare_attackers,
+            ActionType.DECLARE_BLOCKERS: self._fmt_declare_blockers,
+        }
+        # Labels only read the action and the indexes above, so they are formatted once.
+        self._action_labels = [self._format_action(action) for action in actions]
 
         self.header = Static()
         self.player_left = Static()
@@ -55,19 +91,36 @@ class _TurnApp(App[Optional[int]]):
         if not raw:
             return
         if not raw.isdigit():
-            self._error = "Enter a number."
-            self._render()
+            self._set_error("Enter a number.")
             return
         idx = int(raw)
         if idx < 0 or idx >= len(self._actions):
-            self._error = "Choice out of range."
-            self._render()
+            self._set_error("Choice out of range.")
             return
         self.exit(result=idx)
 
+    def _set_error(self, message: str) -> None:
+        if message == self._error:
+            return
+        self._error = message
+        self._mark_dirty()
+
+    def _mark_dirty(self) -> None:
+        # Several changes within one tick share a single queued render.
+        if self._dirty:
+            return
+        self._dirty = True
+        self.call_after_refresh(self._render_if_dirty)
+
+    def _render_if_dirty(self) -> None:
+        if not self._dirty:
+            return
+        self._dirty = False
+        self._render()
+
     def on_key(self, event) -> None:  # type: ignore[override]
         if event.key == "space":
-            idx = self._pass_index()
+            idx = self._pass_idx
             if idx is not None:
                 self.exit(result=idx)
         elif event.key.isdigit():
@@ -75,39 +128,88 @@ class _TurnApp(App[Optional[int]]):
             if idx < len(self._actions):
                 self.exit(result=idx)
 
-    def _pass_index(self) -> Optional[int]:
-        for i, action in enumerate(self._actions):
-            if action.type == ActionType.PASS_PRIORITY:
-                return i
-        return None
-
     def _render(self) -> None:
+        vs = self._visible_state
+        zones = vs.zones
+        hand_ids = tuple(getattr(ci, "instance_id", None) for ci in zones.hand)
+        battlefield_ids = tuple(getattr(perm, "instance_id", None) for perm in zones.battlefield)
+
         p1, p2 = self._player_order()
 
-        header_text = Text(
-            f"Turn {self._visible_state.turn_number} | "
-            f"Phase: {self._visible_state.phase} | "
-            f"Active: {self._visible_state.active_player_id} | "
-            f"Stack: {len(self._visible_state.zones.stack)}"
+        self._update_panel(
+            self.header,
+            "header",
+            (vs.turn_number, vs.phase, vs.active_player_id, len(zones.stack)),
+            lambda: Panel(
+                Text(
+                    f"Turn {vs.turn_number} | "
+                    f"Phase: {vs.phase} | "
+                    f"Active: {vs.active_player_id} | "
+                    f"Stack: {len(zones.stack)}"
+                ),
+                title="GAME STATE",
+            ),
         )
-        self.header.update(Panel(header_text, title="GAME STATE"))
 
-        left_text = self._player_panel_text(p1)
-        right_text = self._player_panel_text(p2)
-        self.player_left.update(Panel(left_text, title=p1))
-        self.player_right.update(Panel(right_text, title=p2))
+        mana = {pid: self._mana_str(pid) for pid in (p1, p2)}
+        player_widgets = ((self.player_left, "player_left", p1), (self.player_right, "player_right", p2))
+        for widget, key, pid in player_widgets:
+            self._update_panel(
+                widget,
+                key,
+                (pid, vs.life_totals.get(pid), mana[pid], hand_ids),
+                lambda pid=pid: Panel(self._player_panel_text(pid), title=pid),
+            )
+
+        battlefield_sig = (
+            tuple(vs.life_totals),
+            tuple(
+                (
+                    getattr(perm, "instance_id", None),
+                    getattr(perm, "controller_id", None),
+                    getattr(perm, "name", None),
+                    getattr(perm, "tapped", False),
+                    getattr(perm, "power", None),
+                    getattr(perm, "toughness", None),
+                )
+                for perm in zones.battlefield
+            ),
+        )
+        self._update_panel(
+            self.battlefield,
+            "battlefield",
+            battlefield_sig,
+            lambda: Panel(self._battlefield_text(), title="BATTLEFIELD"),
+        )
 
-        battlefield_text = self._battlefield_text()
-        self.battlefield.update(Panel(battlefield_text, title="BATTLEFIELD"))
+        self._update_panel(
+            self.stack,
+            "stack",
+            tuple(id(item) for item in zones.stack),
+            lambda: Panel(self._stack_text(), title="STACK"),
+        )
 
-        stack_text = self._stack_text()
-        self.stack.update(Panel(stack_text, title="STACK"))
+        self._update_panel(
+            self.priority,
+            "priority",
+            (vs.priority_holder_id,),
+            lambda: Panel(Text(f"Priority: {vs.priority_holder_id}"), title="PRIORITY"),
+        )
 
-        priority_text = Text(f"Priority: {self._visible_state.priority_holder_id}")
-        self.priority.update(Panel(priority_text, title="PRIORITY"))
+        self._update_panel(
+            self.actions_view,
+            "actions",
+            (id(self._actions), hand_ids, battlefield_ids, self._error),
+            lambda: Panel(self._actions_text(), title="ACTIONS"),
+        )
 
-        actions_text = self._actions_text()
-        self.actions_view.update(Panel(actions_text, title="ACTIONS"))
+    def _update_panel(self, widget: Static, key: str, sig: tuple[Any, ...], build: Callable[[], Panel]) -> None:
+        cached = self._panel_cache.get(key)
+        if cached is not None and cached[0] == sig:
+            return
+        panel = build()
+        self._panel_cache[key] = (sig, panel)
+        widget.update(panel)
 
     def _player_order(self) -> tuple[str, str]:
         ids = list(self._visible_state.life_totals.keys())
@@ -121,26 +223,21 @@ class _TurnApp(App[Optional[int]]):
         life = self._visible_state.life_totals.get(pid, "?")
         mana = self._mana_str(pid)
         hand = self._hand_preview(pid)
-        t = Text()
-        t.append(f"Life: {life}\n")
-        t.append(f"Mana: {mana}\n")
-        t.append(f"Hand: {hand}\n")
-        return t
+        return Text(f"Life: {life}\nMana: {mana}\nHand: {hand}\n")
 
     def _mana_str(self, pid: str) -> str:
         if pid != self._player_id:
             return "?"
         pool = self._visible_state.available_mana or {}
-        colored = dict(pool.get("colored", {}) or {})
+        colored = pool.get("colored", {}) or {}
         generic = int(pool.get("generic", 0) or 0)
-        symbols = {"WHITE": "W", "BLUE": "U", "BLACK": "B", "RED": "R", "GREEN": "G"}
         parts = []
         if generic > 0:
             parts.append(f"{{{generic}}}")
-        for color in ["WHITE", "BLUE", "BLACK", "RED", "GREEN"]:
+        for color, symbol in _MANA_SYMBOLS:
             n = int(colored.get(color, 0) or 0)
             if n > 0:
-                parts.append("{" + symbols[color] + "}" * n)
+                parts.append(symbol * n)
         return "".join(parts) if parts else "{}"
 
     def _hand_preview(self, pid: str) -> str:
@@ -153,94 +250,96 @@ class _TurnApp(App[Optional[int]]):
         return "[" + "][".join(names) + "]"
 
     def _battlefield_text(self) -> Text:
-        t = Text()
+        by_controller: dict[Any, list[Any]] = {}
+        for perm in self._visible_state.zones.battlefield:
+            by_controller.setdefault(getattr(perm, "controller_id", None), []).append(perm)
+        parts: list[str] = []
         for pid in self._visible_state.life_totals.keys():
-            t.append(f"{pid}:\n")
-            for perm in self._visible_state.zones.battlefield:
-                if getattr(perm, "controller_id", None) != pid:
-                    continue
+            parts.append(f"{pid}:\n")
+            for perm in by_controller.get(pid, ()):
                 name = getattr(perm, "name", getattr(perm, "card_id", "?"))
                 pt = self._pt(perm)
                 tapped = " (tapped)" if getattr(perm, "tapped", False) else ""
-                t.append(f"  - {name}{pt}{tapped}\n")
-        return t
+                parts.append(f"  - {name}{pt}{tapped}\n")
+        return Text("".join(parts))
 
     def _stack_text(self) -> Text:
         if not self._visible_state.zones.stack:
             return Text("(empty)")
-        t = Text()
+        parts: list[str] = []
         for item in self._visible_state.zones.stack:
             name = getattr(item, "name", getattr(item, "card_id", "?"))
             target = getattr(item, "targets", None)
             target_str = self._format_target(target)
-            t.append(f"{name}{target_str}\n")
-        return t
+            parts.append(f"{name}{target_str}\n")
+        return Text("".join(parts))
 
     def _actions_text(self) -> Text:
-        t = Text()
-        for i, action in enumerate(self._actions):
-            t.append(f"[{i}] {self._format_action(action)}\n")
+        parts = [f"[{i}] {label}\n" for i, label in enumerate(self._action_labels)]
         if self._error:
-            t.append(f"\nError: {self._error}")
-        return t
+            parts.append(f"\nError: {self._error}")
+        return Text("".join(parts))
 
     def _format_action(self, action: Action) -> str:
         t = action.type
-        if t == ActionType.PLAY_LAND:
-            name = self._card_name_from_hand(action.object_id)
-            if name:
-                return f"Play {name}"
-            return "Play land"
-        if t == ActionType.TAP_FOR_MANA:
-            name = self._card_name_from_battlefield(action.object_id)
-            if name:
-                return f"Tap {name} for mana"
-            return "Tap for mana"
-        if t == ActionType.CAST_SPELL:
-            name = self._card_name_from_hand(action.object_id)
-            cost = self._card_cost_from_hand(action.object_id)
-            target = self._format_target(action.targets)
-            if name:
-                suffix = f" {cost}" if cost else ""
-                return f"Cast {name}{suffix}{target}"
-            return f"Cast spell{target}"
-        if t == ActionType.DECLARE_ATTACKERS:
-            attackers = []
-            if isinstance(action.targets, dict):
-                attackers = list(action.targets.get("attackers", []))
-            names = [self._card_name_from_battlefield(a) or str(a) for a in attackers]
-            if not names:
-                return "Attack with: (none)"
-            return "Attack with: " + ", ".join(names)
-        if t == ActionType.DECLARE_BLOCKERS:
-            blocks = []
-            if isinstance(action.targets, dict):
-                blocks = list(action.targets.get("blocks", []))
-            pairs = []
-            for entry in blocks:
-                if isinstance(entry, dict):
-                    attacker_id = entry.get("attacker_id")
-                    blocker_id = entry.get("blocker_id")
-                elif isinstance(entry, (list, tuple)) and len(entry) == 2:
-                    attacker_id, blocker_id = entry[0], entry[1]
-                else:
-                    continue
-                attacker_name = self._card_name_from_battlefield(attacker_id) or str(attacker_id)
-                blocker_name = self._card_name_from_battlefield(blocker_id) or str(blocker_id)
-                pairs.append(f"{blocker_name} -> {attacker_name}")
-            if not pairs:
-                return "Declare blockers: (none)"
-            return "Declare blockers: " + ", ".join(pairs)
-        if t == ActionType.PASS_PRIORITY:
-            return "Pass priority"
-        if t == ActionType.SCOOP:
-            return "Scoop"
-        if t == ActionType.SKIP_COMBAT:
-            return "Skip combat"
-        if t == ActionType.SKIP_MAIN2:
-            return "Skip main 2"
+        fmt = self._fmt_dispatch.get(t)
+        if fmt is not None:
+            return fmt(action)
+        label = _FIXED_ACTION_LABELS.get(t)
+        if label is not None:
+            return label
         return str(t)
 
+    def _fmt_play_land(self, action: Action) -> str:
+        name = self._card_name_from_hand(action.object_id)
+        if name:
+            return f"Play {name}"
+        return "Play land"
+
+    def _fmt_tap_for_mana(self, action: Action) -> str:
+        name = self._card_name_from_battlefield(action.object_id)
+        if name:
+            return f"Tap {name} for mana"
+        return "Tap for mana"
+
+    def _fmt_cast_spell(self, action: Action) -> str:
+        name = self._card_name_from_hand(action.object_id)
+        cost = self._card_cost_from_hand(action.object_id)
+        target = self._format_target(action.targets)
+        if name:
+            suffix = f" {cost}" if cost else ""
+            return f"Cast {name}{suffix}{target}"
+        return f"Cast spell{target}"
+
+    def _fmt_declare_attackers(self, action: Action) -> str:
+        attackers = []
+        if isinstance(action.targets, dict):
+            attackers = list(action.targets.get("attackers", []))
+        names = [self._card_name_from_battlefield(a) or str(a) for a in attackers]
+        if not names:
+            return "Attack with: (none)"
+        return "Attack with: " + ", ".join(names)
+
+    def _fmt_declare_blockers(self, action: Action) -> str:
+        blocks = []
+        if isinstance(action.targets, dict):
+            blocks = list(action.targets.get("blocks", []))
+        pairs = []
+        for entry in blocks:
+            if isinstance(entry, dict):
+                attacker_id = entry.get("attacker_id")
+                blocker_id = entry.get("blocker_id")
+            elif isinstance(entry, (list, tuple)) and len(entry) == 2:
+                attacker_id, blocker_id = entry[0], entry[1]
+            else:
+                continue
+            attacker_name = self._card_name_from_battlefield(attacker_id) or str(attacker_id)
+            blocker_name = self._card_name_from_battlefield(blocker_id) or str(blocker_id)
+            pairs.append(f"{blocker_name} -> {attacker_name}")
+        if not pairs:
+            return "Declare blockers: (none)"
+        return "Declare blockers: " + ", ".join(pairs)
+
     def _format_target(self, target: Any) -> str:
         if isinstance(target, dict):
             if target.get("type") == "PLAYER":
@@ -250,16 +349,16 @@ class _TurnApp(App[Optional[int]]):
         return ""
 
     def _card_name_from_hand(self, instance_id: Any) -> Optional[str]:
-        for ci in self._visible_state.zones.hand:
-            if getattr(ci, "instance_id", None) == instance_id:
-                return getattr(ci, "name", getattr(ci, "card_id", None))
-        return None
+        ci = self._hand_idx.get(instance_id)
+        if ci is None:
+            return None
+        return getattr(ci, "name", getattr(ci, "card_id", None))
 
     def _card_cost_from_hand(self, instance_id: Any) -> Optional[str]:
-        for ci in self._visible_state.zones.hand:
-            if getattr(ci, "instance_id", None) == instance_id:
-                return self._format_mana_cost(getattr(ci, "mana_cost", None))
-        return None
+        ci = self._hand_idx.get(instance_id)
+        if ci is None:
+            return None
+        return self._format_mana_cost(getattr(ci, "mana_cost", None))
 
     def _format_mana_cost(self, mana_cost: object) -> str:
         if not isinstance(mana_cost, dict):
@@ -269,19 +368,17 @@ class _TurnApp(App[Optional[int]]):
         parts = []
         if isinstance(generic, int) and generic > 0:
             parts.append(f"{{{generic}}}")
-        order = ["WHITE", "BLUE", "BLACK", "RED", "GREEN"]
-        symbols = {"WHITE": "W", "BLUE": "U", "BLACK": "B", "RED": "R", "GREEN": "G"}
-        for color in order:
+        for color, symbol in _MANA_SYMBOLS:
             count = int(colored.get(color, 0) or 0)
             if count > 0:
-                parts.append("{" + symbols[color] + "}" * count)
+                parts.append(symbol * count)
         return "".join(parts)
 
     def _card_name_from_battlefield(self, instance_id: Any) -> Optional[str]:
-        for perm in self._visible_state.zones.battlefield:
-            if getattr(perm, "instance_id", None) == instance_id:
-                return getattr(perm, "name", getattr(perm, "card_id", None))
-        return None
+        perm = self._bf_idx.get(instance_id)
+        if perm is None:
+            return None
+        return getattr(perm, "name", getattr(perm, "card_id", None))
 
     def _pt(self, obj: object) -> str:
         power = getattr(obj, "power", None)
@@ -0,0 +1,275 @@
+import unittest
+
+from mtg_core.actions import Action, ActionType
+from mtg_core.aibase import ResolutionStatus
+from mtg_core.cards import Effect, EffectType, load_card_db
+from mtg_core.engine import MTGEngine
+from mtg_core.game_state import (
+    CardInstance,
+    GameMetadata,
+    GameState,
+    GlobalZones,
+    Permanent,
+    Phase,
+    RandomState,
+    Step,
+    TurnState,
+)
+from mtg_core.player_state import PlayerState
+
+CARD_DB = load_card_db("mtg_core/data/cards_phase1.json")
+
+
+def _card(instance_id: str, card_id: str, owner_id: str = "P1") -> CardInstance:
+    return CardInstance(instance_id=instance_id, card_id=card_id, owner_id=owner_id)
+
+
+class TestAttachmentsAfterHostLeaves(unittest.TestCase):
+    def setUp(self):
+        p1 = PlayerState(
+            player_id="P1",
+            hand=[
+                _card("archer", "thornweald_archer"),
+                _card("vow", "vow_of_wildness"),
+                _card("blade", "ancestral_blade"),
+            ],
+            library=[_card(f"p1_forest_{i}", "basic_forest") for i in range(10)],
+        )
+        p2 = PlayerState(
+            player_id="P2",
+            library=[_card(f"p2_forest_{i}", "basic_forest", "P2") for i in range(10)],
+        )
+        game = GameState(
+            game_id="g",
+            players={"P1": p1, "P2": p2},
+            card_db=CARD_DB,
+            starting_player_id="P1",
+            turn=TurnState(active_player_id="P1", turn_number=2, phase=Phase.MAIN, step=Step.MAIN1),
+            zones=GlobalZones(),
+            rng=RandomState(seed=1),
+            metadata=GameMetadata(),
+        )
+        p1.mana_pool.colored.update({"GREEN": 5, "WHITE": 2})
+        self.game = game
+        self.engine = MTGEngine(game)
+
+    def _submit(self, action: Action) -> None:
+        result = self.engine.submit_action(action)
+        self.assertEqual(result.status, ResolutionStatus.SUCCESS, msg=result.message)
+
+    def _cast_and_resolve(self, instance_id: str, targets=None) -> None:
+        self._submit(Action(ActionType.CAST_SPELL, actor_id="P1", object_id=instance_id, targets=targets))
+        while self.game.zones.stack:
+            self._submit(Action(ActionType.PASS_PRIORITY, actor_id=self.engine.priority_holder))
+
+    def test_spells_resolve_and_attachments_survive_host_leaving(self):
+        battlefield = self.game.zones.battlefield
+        self._cast_and_resolve("archer")
+        self._cast_and_resolve("vow", targets={"type": "PERMANENT", "instance_id": "archer"})
+        self._cast_and_resolve("blade")
+
+        self.assertEqual(battlefield["vow"].state.attached_to, "archer")
+        token_id = battlefield["blade"].state.attached_to
+        self.assertIn(token_id, battlefield)
+        visible = {p.instance_id: p for p in self.engine.get_visible_state("P1").zones.battlefield}
+        self.assertEqual((visible["archer"].power, visible["archer"].toughness), (5, 4))
+        self.assertEqual((visible[token_id].power, visible[token_id].toughness), (2, 2))
+
+        self.engine._destroy_permanent(battlefield["archer"])
+        self.engine._destroy_permanent(battlefield[token_id])
+        self.engine._apply_state_based_actions()
+
+        graveyard = [ci.instance_id for ci in self.game.players["P1"].graveyard]
+        self.assertNotIn("archer", battlefield)
+        self.assertNotIn(token_id, battlefield)
+        self.assertIn("archer", graveyard)
+        self.assertNotIn("vow", battlefield)
+        self.assertIn("vow", graveyard)
+        self.assertIsNone(battlefield["blade"].state.attached_to)
+
+
+class _BoardTestCase(unittest.TestCase):
+    """P1's main phase with a prepared hand, battlefield and mana pool."""
+
+    def _start(self, hand=(), battlefield=(), mana=None):
+        p1 = PlayerState(
+            player_id="P1",
+            hand=[_card(iid, cid) for iid, cid in hand],
+            library=[_card(f"p1_forest_{i}", "basic_forest") for i in range(10)],
+        )
+        p2 = PlayerState(
+            player_id="P2",
+            library=[_card(f"p2_forest_{i}", "basic_forest", "P2") for i in range(10)],
+        )
+        zones = GlobalZones()
+        for iid, cid, controller_id, damage in battlefield:
+            perm = Permanent(instance=_card(iid, cid, controller_id), controller_id=controller_id)
+            perm.state.damage_marked = damage
+            zones.battlefield[iid] = perm
+        self.game = GameState(
+            game_id="g",
+            players={"P1": p1, "P2": p2},
+            card_db=CARD_DB,
+            starting_player_id="P1",
+            turn=TurnState(active_player_id="P1", turn_number=2, phase=Phase.MAIN, step=Step.MAIN1),
+            zones=zones,
+            rng=RandomState(seed=1),
+            metadata=GameMetadata(),
+        )
+        p1.mana_pool.colored.update(mana or {})
+        self.engine = MTGEngine(self.game)
+        self.battlefield = self.game.zones.battlefield
+
+    def _submit(self, action: Action) -> None:
+        result = self.engine.submit_action(action)
+        self.assertEqual(result.status, ResolutionStatus.SUCCESS, msg=result.message)
+
+    def _pass(self) -> None:
+        self._submit(Action(ActionType.PASS_PRIORITY, actor_id=self.engine.priority_holder))
+
+    def _cast_and_resolve(self, instance_id: str, targets=None) -> None:
+        self._submit(Action(ActionType.CAST_SPELL, actor_id="P1", object_id=instance_id, targets=targets))
+        while self.game.zones.stack:
+            self._pass()
+
+    def _graveyard(self, player_id: str):
+        return [ci.instance_id for ci in self.game.players[player_id].graveyard]
+
+
+def _permanent_target(instance_id: str):
+    return {"type": "PERMANENT", "instance_id": instance_id}
+
+
+class TestStateBasedActionRechecks(_BoardTestCase):
+    """A damaged creature is re-checked once anything that can lower its toughness changes."""
+
+    def _start_checked(self, **kwargs):
+        self._start(**kwargs)
+        self.engine._apply_state_based_actions()
+
+    def test_minus_counter_kills_damaged_creature(self):
+        self._start_checked(battlefield=[("twins", "maalfeld_twins", "P2", 3)])
+        self.assertIn("twins", self.battlefield)
+
+        counter = Effect(EffectType.PUT_COUNTERS, {"counter": "-1/-1", "amount": 1})
+        self.engine._apply_put_counters(counter, _permanent_target("twins"))
+        self._pass()
+
+        self.assertNotIn("twins", self.battlefield)
+        self.assertIn("twins", self._graveyard("P2"))
+
+    def test_end_of_turn_shrink_kills_damaged_creature(self):
+        self._start_checked(battlefield=[("twins", "maalfeld_twins", "P2", 3)])
+
+        shrink = Effect(EffectType.MODIFY_P_T, {"amount": {"power": -1, "toughness": -1}})
+        self.engine._add_temporary_effect(shrink, "P1", None, "EOT", _permanent_target("twins"))
+        self._pass()
+
+        self.assertNotIn("twins", self.battlefield)
+
+    def test_lord_leaving_kills_damaged_creature(self):
+        self._start_checked(
+            hand=[("repulse", "repulse")],
+            battlefield=[("druid", "elvish_archdruid", "P1", 0), ("archer", "thornweald_archer", "P1", 1)],
+            mana={"BLUE": 3},
+        )
+        self.assertIn("archer", self.battlefield)
+
+        self._cast_and_resolve("repulse", targets=[[_permanent_target("druid")]])
+
+        self.assertIn("druid", [ci.instance_id for ci in self.game.players["P1"].hand])
+        self.assertNotIn("archer", self.battlefield)
+        self.assertIn("archer", self._graveyard("P1"))
+
+    def test_unchanged_board_skips_the_pass(self):
+        self._start_checked(battlefield=[("twins", "maalfeld_twins", "P2", 3)])
+        calls = []
+        derived = self.engine._derived_battlefield_state
+        self.engine._derived_battlefield_state = lambda: calls.append(1) or derived()
+
+        self.engine._apply_state_based_actions()
+
+        self.assertEqual(calls, [])
+        self.assertIn("twins", self.battlefield)
+
+
+class TestDamageDeaths(_BoardTestCase):
+    def test_creatures_damaged_together_die_in_battlefield_order(self):
+        self._start(
+            battlefield=[
+                ("dissenter", "doomed_dissenter", "P2", 0),
+                ("egg", "dragon_egg", "P2", 0),
+                ("twins", "maalfeld_twins", "P2", 0),
+            ]
+        )
+        self.engine._apply_state_based_actions()
+
+        # Damage them out of battlefield order; only damage changed, so the pass checks just these two.
+        self.engine._deal_damage_direct(2, "PERMANENT", "twins", None, "P1")
+        self.engine._deal_damage_direct(2, "PERMANENT", "egg", None, "P1")
+        self.engine._deal_damage_direct(1, "PERMANENT", "dissenter", None, "P1")
+        self.engine._deal_damage_direct(4, "PERMANENT", "twins", None, "P1")
+        self.assertEqual(self.engine._sba_checked_version, self.engine._derived_version)
+        self._pass()
+
+        self.assertEqual(self._graveyard("P2"), ["dissenter", "egg", "twins"])
+        self.assertEqual(
+            [item.source_instance_id for item in self.game.zones.stack],
+            ["dissenter", "egg", "twins"],
+        )
+
+    def test_noncombat_deathtouch_damage_kills(self):
+        self._start(
+            hand=[("bite", "rabid_bite")],
+            battlefield=[("archer", "thornweald_archer", "P1", 0), ("twins", "maalfeld_twins", "P2", 0)],
+            mana={"GREEN": 2},
+        )
+
+        self._cast_and_resolve(
+            "bite",
+            targets=[[
+                {"type": "PERMANENT", "instance_id": "archer", "role": "source"},
+                {"type": "PERMANENT", "instance_id": "twins", "role": "target"},
+            ]],
+        )
+
+        self.assertEqual(self._graveyard("P1"), ["bite"])
+        self.assertIn("twins", self._graveyard("P2"))
+        self.assertNotIn("twins", self.battlefield)
+        self.assertEqual(self.engine._sba_deathtouch_pending, set())
+
+    def test_burned_creature_dies_after_the_spell_resolves(self):
+        self._start(
+            hand=[("bolt", "lightning_bolt")],
+            battlefield=[("archer", "thornweald_archer", "P1", 0)],
+            mana={"RED": 1},
+        )
+        on_battlefield_after_damage = []
+        deal_damage = self.engine._deal_damage_direct
+
+        def record(*args):
+            deal_damage(*args)
+            on_battlefield_after_damage.append("archer" in self.battlefield)
+
+        self.engine._deal_damage_direct = record
+        self._cast_and_resolve("bolt", targets=[[_permanent_target("archer")]])
+
+        self.assertEqual(on_battlefield_after_damage, [True])
+        self.assertNotIn("archer", self.battlefield)
+        self.assertEqual(self._graveyard("P1"), ["bolt", "archer"])
+
+
+class TestUnknownCards(_BoardTestCase):
+    def test_permanent_with_unknown_card_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self._start(battlefield=[("ghost", "no_such_card", "P1", 0)])
+
+    def test_unknown_card_cannot_enter_the_battlefield(self):
+        self._start()
+        with self.assertRaises(ValueError):
+            self.engine._put_onto_battlefield(Permanent(instance=_card("ghost", "no_such_card"), controller_id="P1"))
+        self.assertNotIn("ghost", self.battlefield)
+
+
+if __name__ == "__main__":
+    unittest.main()
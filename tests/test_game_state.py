@@ -0,0 +1,23 @@
+import unittest
+
+from mtg_core.game_state import StackItem, StackItemKind
+
+
+class TestStackItemKind(unittest.TestCase):
+    def test_members_are_plain_str_enum(self):
+        self.assertEqual(StackItemKind.SPELL.value, "SPELL")
+        self.assertIsInstance(StackItemKind.SPELL, str)
+        self.assertEqual(StackItemKind.ABILITY, "ABILITY")
+
+    def test_members_compare_by_value(self):
+        self.assertNotEqual(StackItemKind.SPELL, StackItemKind.ABILITY)
+        self.assertEqual(len({StackItemKind.SPELL, StackItemKind.ABILITY}), 2)
+
+    def test_ability_item_is_not_a_spell(self):
+        item = StackItem(kind=StackItemKind.ABILITY, controller_id="P1")
+        self.assertFalse(item.kind == StackItemKind.SPELL)
+        item.validate()
+
+
+if __name__ == "__main__":
+    unittest.main()